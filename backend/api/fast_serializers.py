@@ -0,0 +1,145 @@
+"""
+Быстрое чтение рецептов без полей DRF.
+Представления собираются из строк .values_list() функциями доступа,
+составленными по Meta.fields сериализаторов, поэтому совпадают
+с выводом RecipesReadSerializer и RecipesShortSerializer.
+"""
+from collections import defaultdict
+from operator import attrgetter, itemgetter
+
+from api.serializers import (
+    IngredientForReadRecipeSerializer,
+    RecipesReadSerializer,
+    RecipesShortSerializer,
+    TagsSerializer,
+    UserSerializer
+)
+from recipes.models import Recipes, RecipesIngredients
+
+
+def get_file_url(value):
+    """Адрес файла, как его отдаёт ImageField без запроса."""
+    if not value:
+        return None
+    try:
+        return value.url
+    except AttributeError:
+        return None
+
+
+def get_absolute_url(request, url):
+    if url and request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def compile_fields(serializer_class, accessors):
+    """Функции доступа в порядке полей сериализатора."""
+    return tuple(
+        (name, accessors[name]) for name in serializer_class.Meta.fields
+    )
+
+
+def always_none(*args):
+    return None
+
+
+USER_FIELDS = compile_fields(UserSerializer, {
+    'email': attrgetter('email'),
+    'id': attrgetter('id'),
+    'username': attrgetter('username'),
+    'first_name': attrgetter('first_name'),
+    'last_name': attrgetter('last_name'),
+    'is_subscribed': always_none,
+    'avatar': lambda user: get_file_url(user.avatar),
+})
+
+TAG_FIELDS = compile_fields(TagsSerializer, {
+    'id': itemgetter(1),
+    'name': itemgetter(2),
+    'slug': itemgetter(3),
+})
+
+INGREDIENT_FIELDS = compile_fields(IngredientForReadRecipeSerializer, {
+    'id': itemgetter(1),
+    'name': itemgetter(2),
+    'measurement_unit': itemgetter(3),
+    'amount': itemgetter(4),
+})
+
+# Поля рецепта получают сам рецепт и словарь его связей.
+RECIPE_FIELDS = compile_fields(RecipesReadSerializer, {
+    'id': lambda recipe, related: recipe.id,
+    'tags': lambda recipe, related: related['tags'],
+    'author': lambda recipe, related: serialize_user(recipe.author),
+    'ingredients': lambda recipe, related: related['ingredients'],
+    'is_in_shopping_cart': always_none,
+    'is_favorited': always_none,
+    'name': lambda recipe, related: str(recipe.name),
+    'image': lambda recipe, related: get_file_url(recipe.image),
+    'text': lambda recipe, related: str(recipe.text),
+    'cooking_time': lambda recipe, related: int(recipe.cooking_time),
+})
+
+SHORT_RECIPE_FIELDS = compile_fields(RecipesShortSerializer, {
+    'id': lambda recipe, request: recipe.id,
+    'name': lambda recipe, request: str(recipe.name),
+    'image': lambda recipe, request: get_absolute_url(
+        request, get_file_url(recipe.image)
+    ),
+    'cooking_time': lambda recipe, request: int(recipe.cooking_time),
+})
+
+
+def serialize_user(user):
+    return {name: get(user) for name, get in USER_FIELDS}
+
+
+def serialize_rows(rows, fields):
+    """Группирует строки по id рецепта в первом столбце."""
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[row[0]].append({name: get(row) for name, get in fields})
+    return grouped
+
+
+def build_recipe_fragments(recipes):
+    """
+    Представления рецептов без данных пользователя: теги
+    и ингредиенты всех рецептов читаются двумя запросами.
+    """
+    recipe_ids = [recipe.id for recipe in recipes]
+    tags = serialize_rows(
+        Recipes.tags.through.objects.filter(
+            recipes_id__in=recipe_ids
+        ).order_by('tags__name').values_list(
+            'recipes_id', 'tags__id', 'tags__name', 'tags__slug'
+        ),
+        TAG_FIELDS
+    )
+    ingredients = serialize_rows(
+        RecipesIngredients.objects.filter(
+            recipe_id__in=recipe_ids
+        ).order_by('pk').values_list(
+            'recipe_id',
+            'ingredient_id',
+            'ingredient__name',
+            'ingredient__measurement_unit',
+            'amount'
+        ),
+        INGREDIENT_FIELDS
+    )
+    fragments = {}
+    for recipe in recipes:
+        related = {
+            'tags': tags[recipe.id],
+            'ingredients': ingredients[recipe.id],
+        }
+        fragments[recipe.id] = {
+            name: get(recipe, related) for name, get in RECIPE_FIELDS
+        }
+    return fragments
+
+
+def serialize_short_recipe(recipe, request):
+    return {name: get(recipe, request) for name, get in SHORT_RECIPE_FIELDS}
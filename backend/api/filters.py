@@ -1,7 +1,9 @@
 from django.db.models import Case, Exists, IntegerField, OuterRef, Q, When
 from django_filters import rest_framework as filters
 
-from recipes.models import Favourites, Ingredients, Recipes, ShoppingCard, Tags
+from recipes.models import Favourites, Ingredients, Recipes, ShoppingCard
+from recipes.services.search_service import SearchService
+from recipes.services.tag_service import TagService
 
 
 class IngredientFilter(filters.FilterSet):
@@ -17,8 +19,10 @@ class IngredientFilter(filters.FilterSet):
         """
         Фильтрует ингредиенты:
         сначала по началу названия, затем по вхождению.
+        На PostgreSQL внутри групп сортирует по сходству триграмм;
+        в остальных БД IngredientsViewSet ищет по индексу в памяти.
         """
-        return queryset.filter(
+        queryset = queryset.filter(
             Q(name__istartswith=value) | Q(name__icontains=value)
         ).annotate(
             priority=Case(
@@ -26,7 +30,12 @@ class IngredientFilter(filters.FilterSet):
                 default=1,
                 output_field=IntegerField(),
             )
-        ).order_by('priority', 'name')
+        )
+        if SearchService.is_available(queryset.model):
+            return queryset.annotate(
+                similarity=SearchService.similarity(value, 'name')
+            ).order_by('priority', '-similarity', 'name')
+        return queryset.order_by('priority', 'name')
 
 
 class RecipeFilter(filters.FilterSet):
@@ -34,10 +43,9 @@ class RecipeFilter(filters.FilterSet):
     author = filters.NumberFilter(
         field_name='author__id'
     )
-    tags = filters.ModelMultipleChoiceFilter(
-        field_name='tags__slug',
-        to_field_name='slug',
-        queryset=Tags.objects.all()
+    tags = filters.MultipleChoiceFilter(
+        choices=TagService.get_choices,
+        method='filter_tags'
     )
     is_favorited = filters.BooleanFilter(
         method='filter_is_favorited'
@@ -54,6 +62,25 @@ class RecipeFilter(filters.FilterSet):
             'is_in_shopping_cart'
         )
 
+    def filter_tags(self, queryset, name, value):
+        """
+        Рецепты хотя бы с одним из тегов.
+        Полусоединение через EXISTS не размножает строки рецептов.
+        """
+        if not value:
+            return queryset
+        slug_map = TagService.get_slug_map()
+        return queryset.filter(
+            Exists(
+                Recipes.tags.through.objects.filter(
+                    recipes_id=OuterRef('pk'),
+                    tags_id__in=[
+                        slug_map[slug] for slug in value if slug in slug_map
+                    ]
+                )
+            )
+        )
+
     def filter_is_favorited(self, queryset, name, value):
         user = self.request.user
         if user.is_anonymous:
@@ -0,0 +1,512 @@
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+from functools import partial
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import prefetch_related_objects
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment
+)
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.fast_serializers import (
+    build_recipe_fragments,
+    serialize_short_recipe
+)
+from api.renderers import FastJSONRenderer
+from api.serializers import (
+    FRAGMENT_CONTEXT,
+    IngredientGetSerializer,
+    RecipesReadSerializer,
+    RecipesShortSerializer
+)
+from api.services.measurement import measure_request
+from recipes.models import (
+    Favourites,
+    Ingredients,
+    Recipes,
+    RecipesIngredients,
+    ShoppingCard,
+    Tags
+)
+from recipes.services.link_service import LinkService
+from users.models import Subscribers, Users
+
+BATCH_SIZE = 1000
+
+IMAGE = (
+    'data:image/gif;base64,'
+    'R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7'
+)
+
+# Бюджеты для эндпоинтов: максимум SQL-запросов, медиана времени (мс)
+# и пик выделенной памяти (КБ). Превышение любого значения — регрессия.
+BUDGETS = {
+    'recipes-list-anonymous': {'queries': 4, 'ms': 300, 'kb': 4096},
+    'recipes-list': {'queries': 5, 'ms': 300, 'kb': 4096},
+    'recipes-list-cursor': {'queries': 4, 'ms': 300, 'kb': 4096},
+    'recipes-list-tags': {'queries': 6, 'ms': 500, 'kb': 4096},
+    'recipes-list-favorited': {'queries': 5, 'ms': 300, 'kb': 4096},
+    'recipe-detail': {'queries': 4, 'ms': 100, 'kb': 2048},
+    'recipe-create': {'queries': 17, 'ms': 300, 'kb': 4096},
+    'recipe-create-30': {'queries': 17, 'ms': 300, 'kb': 4096},
+    'recipes-bulk-create': {'queries': 11, 'ms': 500, 'kb': 4096},
+    'recipe-get-link': {'queries': 2, 'ms': 50, 'kb': 1024},
+    'recipes-feed': {'queries': 4, 'ms': 300, 'kb': 4096},
+    'subscriptions': {'queries': 4, 'ms': 500, 'kb': 4096},
+    'download-shopping-cart': {'queries': 2, 'ms': 300, 'kb': 4096},
+    'ingredients-search': {'queries': 1, 'ms': 200, 'kb': 4096},
+    'ingredients-list': {'queries': 1, 'ms': 500, 'kb': 8192},
+    'tags-list': {'queries': 1, 'ms': 50, 'kb': 1024},
+    'users-list': {'queries': 2, 'ms': 200, 'kb': 2048},
+    'users-me': {'queries': 2, 'ms': 50, 'kb': 1024},
+    'short-link-redirect': {'queries': 1, 'ms': 50, 'kb': 1024},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет количество SQL-запросов, время ответа и память '
+        'для эндпоинтов API на тестовой базе с реалистичными данными.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=2000,
+            help='Количество пользователей. По умолчанию: 2000'
+        )
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=20000,
+            help='Количество рецептов. По умолчанию: 20000'
+        )
+        parser.add_argument(
+            '--ingredients-per-recipe',
+            type=int,
+            default=8,
+            help='Ингредиентов в одном рецепте. По умолчанию: 8'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Повторов каждого запроса. По умолчанию: 5'
+        )
+        parser.add_argument(
+            '--budgets',
+            type=str,
+            help='JSON-файл с бюджетами, переопределяющими встроенные.'
+        )
+        parser.add_argument(
+            '--serializer-sample',
+            type=int,
+            default=100,
+            help=(
+                'Рецептов для сравнения сериализаторов DRF и быстрого '
+                'чтения. 0 — не сравнивать. По умолчанию: 100'
+            )
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно генератора данных.'
+        )
+
+    def handle(self, *args, **options):
+        budgets = self.load_budgets(options['budgets'])
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0,
+            autoclobber=True,
+            serialize=False
+        )
+        try:
+            with TemporaryDirectory() as media_root:
+                with override_settings(MEDIA_ROOT=media_root):
+                    fixtures = self.seed(
+                        options['users'],
+                        options['recipes'],
+                        options['ingredients_per_recipe'],
+                        random.Random(options['seed'])
+                    )
+                    results = self.run_scenarios(
+                        fixtures, options['repeat']
+                    )
+                    if options['serializer_sample']:
+                        self.compare_serializers(
+                            options['serializer_sample'], options['repeat']
+                        )
+                    self.compare_renderers(options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        self.report(results, budgets)
+
+    @staticmethod
+    def load_budgets(path):
+        budgets = {name: dict(budget) for name, budget in BUDGETS.items()}
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as file:
+                    overrides = json.load(file)
+            except (OSError, ValueError) as error:
+                raise CommandError(f'Не удалось прочитать {path}: {error}')
+            for name, budget in overrides.items():
+                budgets.setdefault(name, {}).update(budget)
+        return budgets
+
+    def seed(self, users_count, recipes_count, per_recipe, rng):
+        self.stdout.write(
+            f'Заполняем базу: {users_count} пользователей, '
+            f'{recipes_count} рецептов.'
+        )
+        data_root = Path(settings.BASE_DIR) / 'data'
+        call_command('import_csv', stdout=StringIO())
+        call_command(
+            'import_csv', data_root / 'tags.json', model='tags',
+            stdout=StringIO()
+        )
+        ingredient_ids = list(
+            Ingredients.objects.values_list('id', flat=True)
+        )
+        tag_ids = list(Tags.objects.values_list('id', flat=True))
+
+        password = make_password(None)
+        Users.objects.bulk_create(
+            (
+                Users(
+                    email=f'user{number}@example.com',
+                    username=f'user{number}',
+                    first_name='Имя',
+                    last_name='Фамилия',
+                    password=password
+                ) for number in range(users_count)
+            ),
+            batch_size=BATCH_SIZE
+        )
+        author_ids = list(Users.objects.values_list('id', flat=True))
+        reader = Users.objects.create_user(
+            email='benchmark@example.com',
+            username='benchmark',
+            first_name='Бенчмарк',
+            last_name='Бенчмарк',
+            password=password
+        )
+
+        now = timezone.now()
+        short_links = LinkService.generate_unique_short_links(
+            Recipes.objects.all(), recipes_count
+        )
+        Recipes.objects.bulk_create(
+            (
+                Recipes(
+                    author_id=rng.choice(author_ids),
+                    name=f'Рецепт {number}',
+                    image='recipes_media/benchmark.png',
+                    text='Описание рецепта. ' * 10,
+                    cooking_time=rng.randint(1, 180),
+                    pub_date=now - timedelta(minutes=number),
+                    short_link=short_links[number]
+                ) for number in range(recipes_count)
+            ),
+            batch_size=BATCH_SIZE
+        )
+        recipe_ids = list(Recipes.objects.values_list('id', flat=True))
+        RecipesIngredients.objects.bulk_create(
+            (
+                RecipesIngredients(
+                    recipe_id=recipe_id,
+                    ingredient_id=ingredient_id,
+                    amount=rng.randint(1, 500)
+                )
+                for recipe_id in recipe_ids
+                for ingredient_id in rng.sample(ingredient_ids, per_recipe)
+            ),
+            batch_size=BATCH_SIZE
+        )
+        Recipes.tags.through.objects.bulk_create(
+            (
+                Recipes.tags.through(recipes_id=recipe_id, tags_id=tag_id)
+                for recipe_id in recipe_ids
+                for tag_id in rng.sample(tag_ids, rng.randint(1, 2))
+            ),
+            batch_size=BATCH_SIZE
+        )
+
+        for model in (Favourites, ShoppingCard):
+            model.objects.bulk_create(
+                model(user=reader, recipe_id=recipe_id)
+                for recipe_id in rng.sample(recipe_ids, 20)
+            )
+        Subscribers.objects.bulk_create(
+            Subscribers(author_id=author_id, subscriber=reader)
+            for author_id in rng.sample(author_ids, min(50, users_count))
+        )
+        call_command('recount', stdout=StringIO())
+        call_command('rebuild_feed', stdout=StringIO())
+        recipe = Recipes.objects.get(pk=rng.choice(recipe_ids))
+        return {
+            'token': Token.objects.create(user=reader).key,
+            'recipe': recipe,
+            'ingredient_ids': ingredient_ids,
+            'tags': list(Tags.objects.all()),
+            'rng': rng,
+        }
+
+    @staticmethod
+    def get_scenarios(fixtures):
+        recipe = fixtures['recipe']
+        rng = fixtures['rng']
+        tags = fixtures['tags']
+        tag_query = '&'.join(f'tags={tag.slug}' for tag in tags[:2])
+
+        def recipe_payload(ingredients_count=10):
+            return {
+                'ingredients': [
+                    {'id': ingredient_id, 'amount': 10}
+                    for ingredient_id in rng.sample(
+                        fixtures['ingredient_ids'], ingredients_count
+                    )
+                ],
+                'tags': [tag.id for tag in tags[:2]],
+                'image': IMAGE,
+                'name': 'Новый рецепт',
+                'text': 'Описание',
+                'cooking_time': 15,
+            }
+
+        return (
+            ('recipes-list-anonymous', False, 'get', '/api/recipes/', None),
+            ('recipes-list', True, 'get', '/api/recipes/', None),
+            (
+                'recipes-list-cursor', True, 'get',
+                '/api/recipes/?pagination=cursor', None
+            ),
+            (
+                'recipes-list-tags', True, 'get',
+                f'/api/recipes/?{tag_query}', None
+            ),
+            (
+                'recipes-list-favorited', True, 'get',
+                '/api/recipes/?is_favorited=1', None
+            ),
+            (
+                'recipe-detail', True, 'get',
+                f'/api/recipes/{recipe.id}/', None
+            ),
+            ('recipe-create', True, 'post', '/api/recipes/', recipe_payload),
+            (
+                'recipe-create-30', True, 'post', '/api/recipes/',
+                partial(recipe_payload, 30)
+            ),
+            (
+                'recipes-bulk-create', True, 'post', '/api/recipes/bulk/',
+                lambda: [recipe_payload() for _ in range(20)]
+            ),
+            (
+                'recipe-get-link', True, 'get',
+                f'/api/recipes/{recipe.id}/get-link/', None
+            ),
+            ('recipes-feed', True, 'get', '/api/recipes/feed/', None),
+            (
+                'subscriptions', True, 'get',
+                '/api/users/subscriptions/?recipes_limit=3', None
+            ),
+            (
+                'download-shopping-cart', True, 'get',
+                '/api/recipes/download_shopping_cart/', None
+            ),
+            (
+                'ingredients-search', False, 'get',
+                '/api/ingredients/?name=ка', None
+            ),
+            ('ingredients-list', False, 'get', '/api/ingredients/', None),
+            ('tags-list', False, 'get', '/api/tags/', None),
+            ('users-list', False, 'get', '/api/users/', None),
+            ('users-me', True, 'get', '/api/users/me/', None),
+            (
+                'short-link-redirect', False, 'get',
+                f'/s/{recipe.short_link}/', None
+            ),
+        )
+
+    def run_scenarios(self, fixtures, repeat):
+        anonymous = APIClient()
+        authorized = APIClient()
+        authorized.credentials(
+            HTTP_AUTHORIZATION=f'Token {fixtures["token"]}'
+        )
+        results = {}
+        for name, auth, method, path, payload in self.get_scenarios(
+            fixtures
+        ):
+            client = authorized if auth else anonymous
+            measurements = []
+            for run in range(repeat + 1):
+                kwargs = {'format': 'json'}
+                if payload:
+                    kwargs['data'] = payload()
+                measurements.append(measure_request(
+                    client, method, path, trace_memory=(run == 0), **kwargs
+                ))
+            traced, timed = measurements[0], measurements[1:] or measurements
+            if traced.status_code >= 400:
+                raise CommandError(
+                    f'{name}: {method.upper()} {path} '
+                    f'вернул {traced.status_code}'
+                )
+            results[name] = {
+                'queries': max(item.queries for item in measurements),
+                'ms': statistics.median(
+                    item.seconds for item in timed
+                ) * 1000,
+                'kb': traced.memory / 1024,
+            }
+        return results
+
+    @staticmethod
+    def drf_fragments(recipes):
+        prefetch_related_objects(recipes, *RecipesReadSerializer.prefetch)
+        serializer = RecipesReadSerializer(context=FRAGMENT_CONTEXT)
+        return {
+            recipe.id: serializer.to_representation(recipe)
+            for recipe in recipes
+        }
+
+    @staticmethod
+    def drf_short(recipes):
+        with override_settings(FAST_READ_SERIALIZERS=False):
+            return RecipesShortSerializer(recipes, many=True).data
+
+    @staticmethod
+    def fast_short(recipes):
+        return [serialize_short_recipe(recipe, None) for recipe in recipes]
+
+    def compare_serializers(self, sample, repeat):
+        """
+        Сравнивает вывод и время сериализаторов DRF и быстрого чтения
+        на одних и тех же рецептах. Расхождение вывода — ошибка.
+        """
+        cases = (
+            ('recipes-read', self.drf_fragments, build_recipe_fragments),
+            ('recipes-short', self.drf_short, self.fast_short),
+        )
+        self.stdout.write(
+            f'{"Сериализатор":<26}{"DRF мс":>10}{"быстрый мс":>12}'
+            f'{"ускорение":>11}'
+        )
+        for name, drf, fast in cases:
+            timings = {}
+            outputs = {}
+            for kind, function in (('drf', drf), ('fast', fast)):
+                measurements = []
+                for _ in range(max(repeat, 1)):
+                    recipes = list(
+                        Recipes.objects.select_related('author')[:sample]
+                    )
+                    started = time.perf_counter()
+                    outputs[kind] = function(recipes)
+                    measurements.append(time.perf_counter() - started)
+                timings[kind] = statistics.median(measurements) * 1000
+            if json.dumps(outputs['drf']) != json.dumps(outputs['fast']):
+                raise CommandError(
+                    f'{name}: вывод быстрого сериализатора отличается от DRF.'
+                )
+            self.stdout.write(
+                f'{name:<26}{timings["drf"]:>10.1f}{timings["fast"]:>12.1f}'
+                f'{timings["drf"] / timings["fast"]:>10.1f}x'
+            )
+
+    def compare_renderers(self, repeat):
+        """
+        Сравнивает JSONRenderer и FastJSONRenderer на списке
+        ингредиентов и странице рецептов. Расхождение вывода — ошибка.
+        """
+        payloads = (
+            (
+                'ingredients-list',
+                IngredientGetSerializer(
+                    Ingredients.objects.all(), many=True
+                ).data
+            ),
+            (
+                'recipes-page',
+                list(build_recipe_fragments(
+                    list(Recipes.objects.select_related('author')[:100])
+                ).values())
+            ),
+        )
+        renderers = (('drf', JSONRenderer()), ('fast', FastJSONRenderer()))
+        self.stdout.write(
+            f'{"Рендерер":<26}{"DRF мс":>10}{"быстрый мс":>12}'
+            f'{"ускорение":>11}'
+        )
+        for name, payload in payloads:
+            timings = {}
+            outputs = {}
+            for kind, renderer in renderers:
+                measurements = []
+                for _ in range(max(repeat, 1)):
+                    started = time.perf_counter()
+                    outputs[kind] = renderer.render(payload)
+                    measurements.append(time.perf_counter() - started)
+                timings[kind] = statistics.median(measurements) * 1000
+            if outputs['drf'] != outputs['fast']:
+                raise CommandError(
+                    f'{name}: вывод FastJSONRenderer отличается от '
+                    'JSONRenderer.'
+                )
+            self.stdout.write(
+                f'{name:<26}{timings["drf"]:>10.2f}{timings["fast"]:>12.2f}'
+                f'{timings["drf"] / timings["fast"]:>10.1f}x'
+            )
+
+    def report(self, results, budgets):
+        self.stdout.write(
+            f'{"Эндпоинт":<26}{"запросы":>9}{"мс":>10}{"КБ":>10}'
+        )
+        failures = []
+        for name, result in results.items():
+            budget = budgets.get(name, {})
+            exceeded = [
+                metric for metric, limit in budget.items()
+                if result[metric] > limit
+            ]
+            line = (
+                f'{name:<26}{result["queries"]:>9}'
+                f'{result["ms"]:>10.1f}{result["kb"]:>10.0f}'
+            )
+            if exceeded:
+                failures.append(
+                    f'{name}: ' + ', '.join(
+                        f'{metric} {result[metric]:.1f} > {budget[metric]}'
+                        for metric in exceeded
+                    )
+                )
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if failures:
+            raise CommandError(
+                'Превышены бюджеты:\n' + '\n'.join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS('Все бюджеты соблюдены.'))
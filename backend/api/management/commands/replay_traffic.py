@@ -0,0 +1,241 @@
+import json
+import queue
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_test_environment,
+    teardown_test_environment
+)
+from django.urls import Resolver404, resolve
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.services.measurement import measure_request, percentile
+from users.models import Users
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class Command(BaseCommand):
+    help = (
+        'Воспроизводит журнал запросов в формате JSONL и выводит '
+        'задержки p50/p95/p99, пропускную способность и количество '
+        'SQL-запросов по эндпоинтам. Каждая строка журнала — объект '
+        'с ключами method, path и необязательными body, user (email '
+        'пользователя) или token. Запросы, меняющие данные (POST, PUT, '
+        'PATCH, DELETE), выполняются только с --allow-writes: они '
+        'изменяют БД из настроек или приложение по --url.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'log_file',
+            type=str,
+            help='Путь к журналу запросов в формате JSONL.'
+        )
+        parser.add_argument(
+            '--url',
+            type=str,
+            help=(
+                'Адрес запущенного приложения. Если не указан, запросы '
+                'выполняются тестовым клиентом Django в этом процессе.'
+            )
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Количество параллельных потоков. По умолчанию: 1'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=1,
+            help='Сколько раз воспроизвести журнал. По умолчанию: 1'
+        )
+        parser.add_argument(
+            '--allow-writes',
+            action='store_true',
+            help=(
+                'Разрешить запросы, меняющие данные. Они выполняются '
+                'по-настоящему, без отката: используйте копию БД.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        entries = self.read_log(options['log_file']) * options['repeat']
+        if not entries:
+            raise CommandError('Журнал запросов пуст.')
+        writes = sum(
+            1 for entry in entries
+            if entry.get('method', 'GET').upper() not in SAFE_METHODS
+        )
+        if writes and not options['allow_writes']:
+            raise CommandError(
+                f'В журнале {writes} запросов, меняющих данные. '
+                'Они изменят БД или приложение по --url; чтобы '
+                'выполнить их, укажите --allow-writes.'
+            )
+        concurrency = max(options['concurrency'], 1)
+        url = options['url']
+        tokens = {} if url else self.get_tokens(entries)
+
+        tasks = queue.Queue()
+        for entry in entries:
+            tasks.put(entry)
+        results = []
+        lock = threading.Lock()
+
+        def worker():
+            client = self.make_client(url)
+            try:
+                while True:
+                    try:
+                        entry = tasks.get_nowait()
+                    except queue.Empty:
+                        return
+                    result = self.send(client, url, entry, tokens)
+                    with lock:
+                        results.append(result)
+            finally:
+                if not url:
+                    connection.close()
+
+        if not url:
+            setup_test_environment()
+        try:
+            started = time.perf_counter()
+            threads = [
+                threading.Thread(target=worker) for _ in range(concurrency)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            if not url:
+                teardown_test_environment()
+        self.report(results, elapsed)
+
+    @staticmethod
+    def read_log(path):
+        entries = []
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                for number, line in enumerate(file, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError as error:
+                        raise CommandError(
+                            f'Строка {number}: некорректный JSON ({error}).'
+                        )
+                    if 'path' not in entry:
+                        raise CommandError(
+                            f'Строка {number}: не указан path.'
+                        )
+                    entries.append(entry)
+        except FileNotFoundError:
+            raise CommandError(f'Файл {path} не найден.')
+        return entries
+
+    @staticmethod
+    def get_tokens(entries):
+        emails = {entry['user'] for entry in entries if entry.get('user')}
+        tokens = {}
+        for user in Users.objects.filter(email__in=emails):
+            token, _ = Token.objects.get_or_create(user=user)
+            tokens[user.email] = token.key
+        missing = emails - tokens.keys()
+        if missing:
+            raise CommandError(
+                'Пользователи не найдены: ' + ', '.join(sorted(missing))
+            )
+        return tokens
+
+    @staticmethod
+    def make_client(url):
+        return requests.Session() if url else APIClient()
+
+    @staticmethod
+    def get_endpoint(method, path):
+        try:
+            name = resolve(urlsplit(path).path).view_name
+        except Resolver404:
+            name = urlsplit(path).path
+        return f'{method} {name}'
+
+    def send(self, client, url, entry, tokens):
+        method = entry.get('method', 'GET').upper()
+        path = entry['path']
+        token = entry.get('token') or tokens.get(entry.get('user'))
+        headers = {'Authorization': f'Token {token}'} if token else {}
+        endpoint = self.get_endpoint(method, path)
+        if url:
+            started = time.perf_counter()
+            response = client.request(
+                method,
+                url.rstrip('/') + path,
+                json=entry.get('body'),
+                headers=headers,
+                allow_redirects=False
+            )
+            return (
+                endpoint,
+                response.status_code,
+                time.perf_counter() - started,
+                None
+            )
+        kwargs = {'format': 'json'}
+        if entry.get('body') is not None:
+            kwargs['data'] = entry['body']
+        if token:
+            kwargs['HTTP_AUTHORIZATION'] = headers['Authorization']
+        measurement = measure_request(client, method, path, **kwargs)
+        return (
+            endpoint,
+            measurement.status_code,
+            measurement.seconds,
+            measurement.queries
+        )
+
+    def report(self, results, elapsed):
+        by_endpoint = defaultdict(list)
+        for result in results:
+            by_endpoint[result[0]].append(result)
+        errors = sum(1 for result in results if result[1] >= 400)
+        self.stdout.write(
+            f'Запросов: {len(results)}, ошибок: {errors}, '
+            f'время: {elapsed:.2f} с, '
+            f'пропускная способность: {len(results) / elapsed:.1f} rps'
+        )
+        self.stdout.write(self.format_row(
+            'Эндпоинт', 'n', 'p50 мс', 'p95 мс', 'p99 мс', 'SQL'
+        ))
+        rows = sorted(by_endpoint.items()) + [('ИТОГО', results)]
+        for endpoint, items in rows:
+            latencies = [item[2] * 1000 for item in items]
+            queries = [item[3] for item in items if item[3] is not None]
+            self.stdout.write(self.format_row(
+                endpoint,
+                len(items),
+                f'{percentile(latencies, 50):.1f}',
+                f'{percentile(latencies, 95):.1f}',
+                f'{percentile(latencies, 99):.1f}',
+                f'{sum(queries) / len(queries):.1f}' if queries else '-'
+            ))
+
+    @staticmethod
+    def format_row(endpoint, count, p50, p95, p99, queries):
+        return (
+            f'{endpoint:<36}{count:>6}{p50:>10}{p95:>10}'
+            f'{p99:>10}{queries:>8}'
+        )
@@ -1,6 +1,20 @@
+from hashlib import md5
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers
+)
+from django.utils.http import http_date
 from rest_framework import status
 from rest_framework.response import Response
 
+from api.paginations import is_cursor_pagination
+from recipes.services.version_service import VersionService
+
 
 class DisableHttpMethodsMixin:
     """Миксин для отключения определённых HTTP-методов"""
@@ -16,3 +30,149 @@ class DisableHttpMethodsMixin:
     def destroy(self, request, *args, **kwargs):
         """DELETE method"""
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class CursorPaginationMixin:
+    """
+    Миксин для выбора курсорной пагинации на уровне запроса.
+    С параметром cursor или pagination=cursor используется
+    cursor_pagination_class, иначе — обычный pagination_class.
+    """
+
+    cursor_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if (
+                self.cursor_pagination_class is not None
+                and is_cursor_pagination(self.request)
+            ):
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+
+def make_cache_entry(content):
+    """Готовый ответ для кэша: тело, ETag и время изменения."""
+    return {
+        'content': content,
+        'etag': f'"{md5(content).hexdigest()}"',
+        'last_modified': int(timezone.now().timestamp()),
+    }
+
+
+def cached_response(request, cached, content_type, **cache_control):
+    """Ответ из кэша с заголовками для условных запросов."""
+    response = HttpResponse(cached['content'], content_type=content_type)
+    response['ETag'] = cached['etag']
+    response['Last-Modified'] = http_date(cached['last_modified'])
+    patch_cache_control(response, **cache_control)
+    patch_vary_headers(response, ('Accept',))
+    return get_conditional_response(
+        request,
+        etag=cached['etag'],
+        last_modified=cached['last_modified'],
+        response=response
+    )
+
+
+class CachedListMixin:
+    """
+    Миксин для отдачи списка готовым JSON из кэша.
+    Кэш версионируется по cache_namespace, ответ содержит ETag
+    и Last-Modified, на условные запросы отвечает 304.
+    """
+
+    cache_namespace = None
+
+    def get_cached_list(self, request):
+        version = VersionService.get_version(self.cache_namespace)
+        key = f'list:{self.cache_namespace}:{version}'
+        cached = cache.get(key)
+        if cached is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            cached = make_cache_entry(request.accepted_renderer.render(
+                self.get_serializer(queryset, many=True).data,
+                request.accepted_media_type,
+                self.get_renderer_context()
+            ))
+            cache.set(key, cached)
+        return cached
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params or request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+        return cached_response(
+            request,
+            self.get_cached_list(request),
+            request.accepted_renderer.media_type,
+            no_cache=True
+        )
+
+
+class AnonymousCacheMixin:
+    """
+    Миксин для кэширования ответов list и retrieve анонимным
+    пользователям. Ключ — адрес запроса с упорядоченными параметрами
+    и поколение anonymous_cache_namespace, которое увеличивается
+    при изменении данных. Ответ разрешено кэшировать прокси
+    на anonymous_cache_max_age секунд.
+    """
+
+    anonymous_cache_namespace = None
+    anonymous_cache_timeout = None
+    anonymous_cache_max_age = 0
+
+    def get_anonymous_cache_key(self, request):
+        query = '&'.join(
+            f'{name}={",".join(sorted(values))}'
+            for name, values in sorted(request.query_params.lists())
+        )
+        address = f'{request.get_host()}{request.path}?{query}'
+        version = VersionService.get_version(self.anonymous_cache_namespace)
+        return (
+            f'anonymous:{self.anonymous_cache_namespace}:{version}:'
+            f'{md5(address.encode()).hexdigest()}'
+        )
+
+    def get_anonymous_cached(self, handler, request, *args, **kwargs):
+        if (
+            not request.user.is_anonymous
+            or request.accepted_renderer.format != 'json'
+        ):
+            response = handler(request, *args, **kwargs)
+            patch_vary_headers(response, ('Authorization',))
+            return response
+        key = self.get_anonymous_cache_key(request)
+        cached = cache.get(key)
+        if cached is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cached = make_cache_entry(request.accepted_renderer.render(
+                response.data,
+                request.accepted_media_type,
+                self.get_renderer_context()
+            ))
+            cache.set(key, cached, self.anonymous_cache_timeout)
+        response = cached_response(
+            request,
+            cached,
+            request.accepted_renderer.media_type,
+            public=True,
+            max_age=self.anonymous_cache_max_age
+        )
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_anonymous_cached(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_anonymous_cached(
+            super().retrieve, request, *args, **kwargs
+        )
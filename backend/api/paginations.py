@@ -1,5 +1,221 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from functools import partial, reduce
+from operator import or_
+
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    PageNumberPagination
+)
+
+from recipes.models import FeedEntry, Recipes
+from recipes.services.count_service import CountService
+from recipes.services.feed_service import FeedService
+
+CURSOR_PAGINATION = 'cursor'
+USER_FILTERS = ('is_favorited', 'is_in_shopping_cart')
 
 
 class RecipesPageNumberPagination(PageNumberPagination):
     page_size_query_param = 'limit'
+
+
+class CachedCountPaginator(DjangoPaginator):
+    """Paginator, берущий общее количество из get_count."""
+
+    def __init__(self, *args, get_count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.get_count = get_count
+
+    @cached_property
+    def count(self):
+        if self.get_count is None:
+            return super().count
+        return self.get_count(self.object_list)
+
+
+class CachedCountPagination(RecipesPageNumberPagination):
+    """
+    Постраничная пагинация рецептов с кэшированным COUNT(*).
+    Количество хранится по нормализованным параметрам фильтрации
+    и сбрасывается при создании и удалении рецептов.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        filters = {
+            name: request.query_params.getlist(name)
+            for name in request.query_params
+            if name not in (self.page_query_param, self.page_size_query_param)
+        }
+        user = request.user
+        user_id = (
+            user.id
+            if user.is_authenticated and filters.keys() & set(USER_FILTERS)
+            else None
+        )
+        self.django_paginator_class = partial(
+            CachedCountPaginator,
+            get_count=partial(
+                CountService.count,
+                key=CountService.get_key(filters, user_id),
+                filtered=bool(filters)
+            )
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация по составному ключу из полей ordering.
+    Страница выбирается условием вида
+    (pub_date, id) < (:pub_date, :id) без OFFSET и COUNT(*).
+    Поля ordering должны однозначно определять порядок записей.
+    """
+
+    page_size_query_param = 'limit'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        fields = self.get_keyset_fields(reverse)
+        values = None
+        if self.cursor and self.cursor.position is not None:
+            values = self.decode_position(
+                queryset.model, fields, self.cursor.position
+            )
+        queryset = self.get_page_queryset(queryset, fields, values)
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        return self.page
+
+    def get_keyset_fields(self, reverse):
+        if not reverse:
+            return self.ordering
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        )
+
+    def decode_position(self, model, fields, position):
+        try:
+            values = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(fields, json.loads(position))
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        if len(values) != len(fields):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    @staticmethod
+    def get_keyset_filter(fields, values):
+        """Условие «строка после values» в порядке fields."""
+        names = [field.lstrip('-') for field in fields]
+        conditions = []
+        for index, field in enumerate(fields):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition = dict(zip(names[:index], values[:index]))
+            condition[f'{names[index]}__{lookup}'] = values[index]
+            conditions.append(Q(**condition))
+        return reduce(or_, conditions)
+
+    def get_page_queryset(self, queryset, fields, values):
+        """Выборка страницы: сортировка и условие по курсору."""
+        queryset = queryset.order_by(*fields)
+        if values is None:
+            return queryset
+        return queryset.filter(self.get_keyset_filter(fields, values))
+
+    def get_position(self, instance):
+        return json.dumps([
+            instance._meta.get_field(
+                field.lstrip('-')
+            ).value_to_string(instance)
+            for field in self.ordering
+        ])
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(
+            offset=0,
+            reverse=False,
+            position=self.get_position(self.page[-1])
+        ))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(
+            offset=0,
+            reverse=True,
+            position=self.get_position(self.page[0])
+        ))
+
+
+class RecipesCursorPagination(KeysetCursorPagination):
+    ordering = ('-pub_date', '-id')
+
+
+class UsersCursorPagination(KeysetCursorPagination):
+    ordering = ('username',)
+
+
+class FeedCursorPagination(RecipesCursorPagination):
+    """
+    Курсорная пагинация ленты подписок.
+    Страница собирается из диапазона записей ленты пользователя
+    по индексу (user, pub_date, recipe) и последних рецептов авторов,
+    которые не раскладываются по лентам.
+    """
+
+    entry_fields = {'pub_date': 'pub_date', 'id': 'recipe_id'}
+
+    def get_page_queryset(self, queryset, fields, values):
+        limit = self.page_size + 1
+        entry_fields = [
+            field[:-len(name)] + self.entry_fields[name]
+            for field, name in (
+                (field, field.lstrip('-')) for field in fields
+            )
+        ]
+        entries = FeedEntry.objects.filter(user=self.request.user)
+        recipes = Recipes.objects.filter(
+            author_id__in=FeedService.get_read_authors(self.request.user)
+        )
+        if values is not None:
+            entries = entries.filter(
+                self.get_keyset_filter(entry_fields, values)
+            )
+            recipes = recipes.filter(self.get_keyset_filter(fields, values))
+        return queryset.filter(
+            Q(id__in=entries.order_by(*entry_fields).values(
+                'recipe_id'
+            )[:limit])
+            | Q(id__in=recipes.order_by(*fields).values('id')[:limit])
+        ).order_by(*fields)
+
+
+def is_cursor_pagination(request):
+    """Клиент запросил курсорную пагинацию."""
+    return (
+        CursorPagination.cursor_query_param in request.query_params
+        or request.query_params.get('pagination') == CURSOR_PAGINATION
+    )
@@ -0,0 +1,142 @@
+import abc
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+shopping_cart_renderers = {}
+
+
+def register_shopping_cart_renderer(renderer_class):
+    """Регистрирует формат выгрузки списка покупок."""
+    shopping_cart_renderers[renderer_class.format] = renderer_class
+    return renderer_class
+
+
+class ShoppingCartRenderer(abc.ABC, BaseRenderer):
+    """
+    Базовый рендерер списка покупок.
+    stream() построчно выдаёт файл из итератора ингредиентов.
+    Ошибки рендерит JSON-рендерер по умолчанию, см. RecipeViewSet.
+    """
+
+    charset = 'utf-8'
+
+    @abc.abstractmethod
+    def stream(self, ingredients):
+        """Выдаёт файл по частям."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return ''.join(self.stream(data))
+
+
+@register_shopping_cart_renderer
+class TextShoppingCartRenderer(ShoppingCartRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, ingredients):
+        separator = ''
+        for ingredient in ingredients:
+            yield (
+                f'{separator}- {ingredient["name"]} '
+                f'({ingredient["total_amount"]} '
+                f'{ingredient["measurement_unit"]})'
+            )
+            separator = '\n'
+
+
+class Echo:
+    """Псевдобуфер для csv.writer, возвращающий записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+@register_shopping_cart_renderer
+class CSVShoppingCartRenderer(ShoppingCartRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, ingredients):
+        writer = csv.writer(Echo())
+        yield writer.writerow(('name', 'measurement_unit', 'amount'))
+        for ingredient in ingredients:
+            yield writer.writerow((
+                ingredient['name'],
+                ingredient['measurement_unit'],
+                ingredient['total_amount']
+            ))
+
+
+@register_shopping_cart_renderer
+class JSONShoppingCartRenderer(ShoppingCartRenderer):
+    media_type = 'application/json'
+    format = 'json'
+
+    def stream(self, ingredients):
+        separator = ''
+        yield '['
+        for ingredient in ingredients:
+            yield separator + json.dumps(
+                {
+                    'name': ingredient['name'],
+                    'measurement_unit': ingredient['measurement_unit'],
+                    'amount': ingredient['total_amount'],
+                },
+                ensure_ascii=False
+            )
+            separator = ','
+        yield ']'
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson, если он установлен.
+    Типы, которых нет в JSON (datetime, Decimal, ленивые строки и т. п.),
+    передаются в encoder_class, как и в JSONRenderer, и вывод совпадает
+    побайтно. Исключение — float: orjson пишет 1e16 и 1.5e-7 вместо
+    1e+16 и 1.5e-07, а NaN и бесконечность выводит как null, а не
+    отклоняет. В ответах API float нет; Decimal, который encoder_class
+    превращает во float, и целые больше 64 бит рендерит стандартный
+    json, как и вывод с отступами или ensure_ascii.
+    """
+
+    if orjson is not None:
+        options = (
+            orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+            | orjson.OPT_NON_STR_KEYS
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        encoder = self.encoder_class()
+
+        def default(value):
+            value = encoder.default(value)
+            if isinstance(value, float):
+                raise TypeError('float рендерит стандартный json.')
+            return value
+
+        try:
+            content = orjson.dumps(data, default=default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return content.replace(
+            '\u2028'.encode(), b'\\u2028'
+        ).replace(
+            '\u2029'.encode(), b'\\u2029'
+        )
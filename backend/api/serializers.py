@@ -1,8 +1,13 @@
+from collections.abc import Mapping
+
+from django.conf import settings
 from django.db import transaction
-from django.db.models import Count
+from django.db.models import Manager, Prefetch, prefetch_related_objects
+from django.urls import reverse
 from drf_extra_fields.fields import Base64ImageField
 from djoser.serializers import UserSerializer as DjoserUserSerializer
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from .constaints import MIN_INTEGER_VALUE
 from recipes.models import (
@@ -13,8 +18,15 @@ from recipes.models import (
     ShoppingCard,
     Tags
 )
+from recipes.services.fragment_service import RecipeFragmentService
+from recipes.services.link_service import LinkService
+from recipes.signals import recipes_bulk_created
 from users.models import Subscribers, Users
 
+# Контекст сборки представления рецепта без запроса: без данных
+# пользователя и с относительными адресами изображений.
+FRAGMENT_CONTEXT = {'fragment': True}
+
 
 class UserSerializer(DjoserUserSerializer):
     """Сериализатор для запросов к пользователям."""
@@ -28,6 +40,9 @@ class UserSerializer(DjoserUserSerializer):
         )
 
     def get_is_subscribed(self, obj):
+        is_subscribed = getattr(obj, 'is_subscribed', None)
+        if is_subscribed is not None:
+            return is_subscribed
         request = self.context.get('request')
         return (
             request
@@ -70,9 +85,7 @@ class IngredientForWriteRecipeSerializer(serializers.ModelSerializer):
     Для интеграции в другие сериализатры.
     """
 
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredients.objects.all()
-    )
+    id = serializers.IntegerField()
     amount = serializers.IntegerField(
         min_value=MIN_INTEGER_VALUE
     )
@@ -125,8 +138,40 @@ class IngredientGetSerializer(serializers.ModelSerializer):
         )
 
 
+class RecipesListSerializer(serializers.ListSerializer):
+    """
+    Список рецептов: кэшированные представления берутся одним
+    запросом к кэшу, связи подгружаются только для промахов.
+    """
+
+    def to_representation(self, data):
+        recipes = list(data.all() if isinstance(data, Manager) else data)
+        fragments = RecipeFragmentService.get_many(
+            [recipe.id for recipe in recipes]
+        )
+        missing = [recipe for recipe in recipes if recipe.id not in fragments]
+        if missing:
+            fragments.update(self.child.get_fragments(missing))
+        return [
+            self.child.overlay(fragments[recipe.id], recipe)
+            for recipe in recipes
+        ]
+
+
 class RecipesReadSerializer(serializers.ModelSerializer):
-    """Сериализатор для чтения рецептов."""
+    """
+    Сериализатор для чтения рецептов.
+    Не зависящая от пользователя часть кэшируется по рецептам,
+    поверх неё подставляются данные текущего пользователя.
+    """
+
+    prefetch = (
+        'tags',
+        Prefetch(
+            'ingredients_for_recipe',
+            queryset=RecipesIngredients.objects.select_related('ingredient')
+        ),
+    )
 
     ingredients = IngredientForReadRecipeSerializer(
         many=True,
@@ -153,8 +198,60 @@ class RecipesReadSerializer(serializers.ModelSerializer):
             'text',
             'cooking_time'
         )
+        list_serializer_class = RecipesListSerializer
+
+    def get_fragments(self, recipes):
+        """Собирает и кэширует представления рецептов."""
+        if settings.FAST_READ_SERIALIZERS:
+            from api.fast_serializers import build_recipe_fragments
+
+            fragments = build_recipe_fragments(recipes)
+        else:
+            prefetch_related_objects(recipes, *self.prefetch)
+            serializer = type(self)(context=FRAGMENT_CONTEXT)
+            fragments = {
+                recipe.id: serializer.to_representation(recipe)
+                for recipe in recipes
+            }
+        RecipeFragmentService.set_many(fragments)
+        return fragments
+
+    def get_absolute_url(self, url):
+        request = self.context.get('request')
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    def overlay(self, fragment, instance):
+        """Представление рецепта с данными текущего пользователя."""
+        is_subscribed = getattr(instance, 'is_author_subscribed', None)
+        if is_subscribed is not None:
+            instance.author.is_subscribed = is_subscribed
+        data = fragment.copy()
+        data['image'] = self.get_absolute_url(fragment['image'])
+        data['author'] = author = fragment['author'].copy()
+        author['avatar'] = self.get_absolute_url(author['avatar'])
+        author['is_subscribed'] = self.fields['author'].get_is_subscribed(
+            instance.author
+        )
+        data['is_in_shopping_cart'] = self.get_is_in_shopping_cart(instance)
+        data['is_favorited'] = self.get_is_favorited(instance)
+        return data
+
+    def to_representation(self, instance):
+        if self.context.get('fragment'):
+            return super().to_representation(instance)
+        fragment = RecipeFragmentService.get_many(
+            (instance.id,)
+        ).get(instance.id)
+        if fragment is None:
+            fragment = self.get_fragments([instance])[instance.id]
+        return self.overlay(fragment, instance)
 
     def get_is_in_shopping_cart(self, obj):
+        is_in_shopping_cart = getattr(obj, 'is_in_shopping_cart', None)
+        if is_in_shopping_cart is not None:
+            return is_in_shopping_cart
         request = self.context.get('request')
         return (
             request
@@ -165,6 +262,9 @@ class RecipesReadSerializer(serializers.ModelSerializer):
         )
 
     def get_is_favorited(self, obj):
+        is_favorited = getattr(obj, 'is_favorited', None)
+        if is_favorited is not None:
+            return is_favorited
         request = self.context.get('request')
         return (
             request
@@ -175,6 +275,107 @@ class RecipesReadSerializer(serializers.ModelSerializer):
         )
 
 
+class RecipesBulkWriteSerializer(serializers.ListSerializer):
+    """
+    Пакетное создание рецептов.
+    Ингредиенты и теги всего пакета загружаются двумя запросами,
+    рецепты и их связи записываются через bulk_create.
+    """
+
+    @staticmethod
+    def parse_ids(values):
+        ids = set()
+        for value in values:
+            try:
+                ids.add(int(value))
+            except (TypeError, ValueError):
+                continue
+        return ids
+
+    def preload_objects(self, data):
+        """Объекты, на которые ссылаются рецепты пакета, для get_objects."""
+        ingredient_ids = []
+        tag_ids = []
+        for item in data:
+            if not isinstance(item, Mapping):
+                continue
+            ingredients = item.get('ingredients')
+            if isinstance(ingredients, list):
+                ingredient_ids += [
+                    ingredient.get('id') for ingredient in ingredients
+                    if isinstance(ingredient, Mapping)
+                ]
+            tags = item.get('tags')
+            if isinstance(tags, list):
+                tag_ids += tags
+        self.context['objects'] = {
+            Ingredients: Ingredients.objects.in_bulk(
+                self.parse_ids(ingredient_ids)
+            ),
+            Tags: Tags.objects.in_bulk(self.parse_ids(tag_ids)),
+        }
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            if len(data) > settings.RECIPES_BULK_MAX_SIZE:
+                raise serializers.ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        'В пакете не больше '
+                        f'{settings.RECIPES_BULK_MAX_SIZE} рецептов.'
+                    ]
+                })
+            self.preload_objects(data)
+        return super().to_internal_value(data)
+
+    @transaction.atomic
+    def create(self, validated_data):
+        short_links = LinkService.generate_unique_short_links(
+            Recipes.objects.all(), len(validated_data)
+        )
+        recipes = []
+        related = []
+        for attrs, short_link in zip(validated_data, short_links):
+            attrs = dict(attrs)
+            related.append((attrs.pop('ingredients'), attrs.pop('tags')))
+            recipes.append(Recipes(short_link=short_link, **attrs))
+        Recipes.objects.bulk_create(recipes)
+        if any(recipe.pk is None for recipe in recipes):
+            # Без RETURNING (SQLite) id читаются по коротким ссылкам.
+            ids = dict(Recipes.objects.filter(
+                short_link__in=short_links
+            ).values_list('short_link', 'id'))
+            for recipe in recipes:
+                recipe.pk = ids[recipe.short_link]
+        RecipesIngredients.objects.bulk_create(
+            RecipesIngredients(
+                recipe=recipe,
+                ingredient=ingredient['id'],
+                amount=ingredient['amount']
+            )
+            for recipe, (ingredients, _) in zip(recipes, related)
+            for ingredient in ingredients
+        )
+        Recipes.tags.through.objects.bulk_create(
+            Recipes.tags.through(recipes_id=recipe.pk, tags_id=tag.pk)
+            for recipe, (_, tags) in zip(recipes, related)
+            for tag in tags
+        )
+        recipes_bulk_created(recipes)
+        return recipes
+
+    def to_representation(self, data):
+        request = self.context.get('request')
+        representation = []
+        for recipe in data:
+            short_link = reverse(
+                'recipe_redirect', kwargs={'link': recipe.short_link}
+            )
+            if request is not None:
+                short_link = request.build_absolute_uri(short_link)
+            representation.append({'id': recipe.pk, 'short_link': short_link})
+        return representation
+
+
 class RecipesWriteSerializer(serializers.ModelSerializer):
     """Сериализатор для записи рецептов."""
 
@@ -182,9 +383,8 @@ class RecipesWriteSerializer(serializers.ModelSerializer):
         many=True,
         required=True
     )
-    tags = serializers.PrimaryKeyRelatedField(
-        many=True,
-        queryset=Tags.objects.all()
+    tags = serializers.ListField(
+        child=serializers.IntegerField()
     )
     image = Base64ImageField(
         required=False
@@ -209,6 +409,7 @@ class RecipesWriteSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'author': {'required': False}
         }
+        list_serializer_class = RecipesBulkWriteSerializer
 
     def validate_image(self, value):
         if not value:
@@ -217,6 +418,37 @@ class RecipesWriteSerializer(serializers.ModelSerializer):
             )
         return value
 
+    def get_objects(self, model, ids, message):
+        """
+        Объекты по id одним запросом или из загруженных для пакета.
+        Если каких-то нет, в ошибке перечисляются все такие id.
+        """
+        objects = self.context.get('objects', {}).get(model)
+        if objects is None:
+            objects = model.objects.in_bulk(ids)
+        missing = sorted(set(ids) - objects.keys())
+        if missing:
+            raise serializers.ValidationError(
+                message.format(ids=', '.join(map(str, missing)))
+            )
+        return objects
+
+    def validate_ingredients(self, value):
+        ingredients = self.get_objects(
+            Ingredients,
+            [ingredient['id'] for ingredient in value],
+            'Ингредиенты с id {ids} не существуют.'
+        )
+        for ingredient in value:
+            ingredient['id'] = ingredients[ingredient['id']]
+        return value
+
+    def validate_tags(self, value):
+        tags = self.get_objects(
+            Tags, value, 'Теги с id {ids} не существуют.'
+        )
+        return [tags[tag_id] for tag_id in value]
+
     def validate(self, attrs):
         attrs = super().validate(attrs)
         ingredients = attrs.get('ingredients', '')
@@ -261,13 +493,48 @@ class RecipesWriteSerializer(serializers.ModelSerializer):
         recipe.tags.set(tags)
         return recipe
 
+    @classmethod
+    def _ingredients_update(cls, recipe, ingredients):
+        """
+        Меняет только отличающиеся строки ингредиентов рецепта:
+        лишние удаляются, у оставшихся обновляется количество,
+        новые добавляются.
+        """
+        amounts = {
+            ingredient['id'].id: ingredient['amount']
+            for ingredient in ingredients
+        }
+        current = {
+            row.ingredient_id: row
+            for row in RecipesIngredients.objects.filter(recipe=recipe)
+        }
+        removed = [
+            row.id for ingredient_id, row in current.items()
+            if ingredient_id not in amounts
+        ]
+        if removed:
+            RecipesIngredients.objects.filter(id__in=removed).delete()
+        changed = []
+        for ingredient_id, row in current.items():
+            amount = amounts.get(ingredient_id)
+            if amount is not None and amount != row.amount:
+                row.amount = amount
+                changed.append(row)
+        if changed:
+            RecipesIngredients.objects.bulk_update(changed, ('amount',))
+        cls._ingredients_create(recipe, (
+            ingredient for ingredient in ingredients
+            if ingredient['id'].id not in current
+        ))
+
     @transaction.atomic
     def update(self, instance, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
+        # set() сравнивает с текущими тегами и без изменений ничего
+        # не пишет.
         instance.tags.set(tags)
-        instance.ingredients.clear()
-        self._ingredients_create(instance, ingredients)
+        self._ingredients_update(instance, ingredients)
         return super().update(instance, validated_data)
 
     def to_representation(self, instance):
@@ -294,6 +561,15 @@ class RecipesShortSerializer(serializers.ModelSerializer):
             'cooking_time'
         )
 
+    def to_representation(self, instance):
+        if settings.FAST_READ_SERIALIZERS:
+            from api.fast_serializers import serialize_short_recipe
+
+            return serialize_short_recipe(
+                instance, self.context.get('request')
+            )
+        return super().to_representation(instance)
+
 
 class SubscriberReadSerializer(UserSerializer):
     """Сериализатор для чтения подписок."""
@@ -301,7 +577,7 @@ class SubscriberReadSerializer(UserSerializer):
     recipes = serializers.SerializerMethodField(
         method_name='get_recipes'
     )
-    recipes_count = serializers.IntegerField()
+    recipes_count = serializers.IntegerField(read_only=True)
 
     class Meta(UserSerializer.Meta):
         fields = UserSerializer.Meta.fields + (
@@ -309,17 +585,24 @@ class SubscriberReadSerializer(UserSerializer):
             'recipes_count'
         )
 
+    @staticmethod
+    def get_recipes_limit(request):
+        """Значение recipes_limit из запроса или None."""
+        if request is None:
+            return None
+        try:
+            limit = int(request.query_params.get('recipes_limit'))
+        except (ValueError, TypeError):
+            return None
+        return limit if limit >= 0 else None
+
     def get_recipes(self, obj):
-        queryset = obj.recipes.all()
-        request = self.context.get('request')
-        if request:
-            recipes_limit = request.query_params.get('recipes_limit')
-            if recipes_limit:
-                try:
-                    limit = int(recipes_limit)
-                    queryset = queryset[:limit]
-                except (ValueError, TypeError):
-                    pass
+        queryset = getattr(obj, 'limited_recipes', None)
+        if queryset is None:
+            queryset = obj.recipes.all()
+            limit = self.get_recipes_limit(self.context.get('request'))
+            if limit is not None:
+                queryset = queryset[:limit]
         return RecipesShortSerializer(
             queryset,
             many=True,
@@ -357,13 +640,8 @@ class SubscriberWriteSerializer(serializers.ModelSerializer):
         return super().validate(attrs)
 
     def to_representation(self, instance):
-        instance = Users.objects.annotate(
-            recipes_count=Count('recipes')
-        ).get(
-            pk=instance.author.pk
-        )
         return SubscriberReadSerializer(
-            instance,
+            instance.author,
             context=self.context
         ).data
 
@@ -0,0 +1,49 @@
+import math
+import time
+import tracemalloc
+from collections import namedtuple
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+Measurement = namedtuple(
+    'Measurement',
+    ('status_code', 'queries', 'seconds', 'memory')
+)
+
+
+def measure_request(client, method, path, trace_memory=False, **kwargs):
+    """
+    Выполняет запрос через тестовый клиент и замеряет
+    количество SQL-запросов, время и пик выделенной памяти.
+    """
+    send = getattr(client, method.lower())
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = send(path, **kwargs)
+            if getattr(response, 'streaming', False):
+                b''.join(response.streaming_content)
+            seconds = time.perf_counter() - started
+        memory = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return Measurement(
+        response.status_code,
+        len(queries.captured_queries),
+        seconds,
+        memory
+    )
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
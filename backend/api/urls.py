@@ -5,7 +5,8 @@ from api.views import (
     IngredientsViewSet,
     RecipeViewSet,
     TagsViewSet,
-    UserViewSet
+    UserViewSet,
+    short_link_stats
 )
 
 
@@ -35,5 +36,6 @@ router.register(
 
 urlpatterns = [
     path('auth/', include('djoser.urls.authtoken')),
+    path('short-links/stats/', short_link_stats, name='short_link_stats'),
     path('', include(router.urls))
 ]
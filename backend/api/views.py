@@ -1,28 +1,55 @@
-from io import BytesIO
-
-from django.db.models import Count, F, Sum
-from django.http import FileResponse, JsonResponse
+from urllib.parse import quote
+
+from django.conf import settings
+from django.db.models import (
+    Exists,
+    F,
+    OuterRef,
+    Prefetch,
+    Sum,
+    Value,
+    Window,
+    prefetch_related_objects
+)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django_filters.rest_framework import DjangoFilterBackend
 import djoser.views
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import (
     AllowAny,
+    IsAdminUser,
     IsAuthenticated,
-    IsAuthenticatedOrReadOnly
+    IsAuthenticatedOrReadOnly,
+    SAFE_METHODS
 )
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 from api.filters import IngredientFilter, RecipeFilter
-from api.paginations import RecipesPageNumberPagination
+from api.mixins import (
+    AnonymousCacheMixin,
+    CachedListMixin,
+    CursorPaginationMixin
+)
+from api.paginations import (
+    CachedCountPagination,
+    FeedCursorPagination,
+    RecipesCursorPagination,
+    UsersCursorPagination
+)
 from api.permissions import OnlyAuthorOrReadOnly
+from api.renderers import shopping_cart_renderers
 from api.serializers import (
     AvatarSerializer,
     FavoriteSerializer,
     IngredientGetSerializer,
+    RecipesReadSerializer,
     RecipesWriteSerializer,
     ShoppingCardSerializer,
     SubscriberReadSerializer,
@@ -38,16 +65,20 @@ from recipes.models import (
     ShoppingCard,
     Tags
 )
-from users.models import Users
+from recipes.services.ingredient_index import ingredient_index
+from recipes.services.link_resolver import short_link_resolver
+from recipes.services.search_service import SearchService
+from users.models import Subscribers, Users
 
 
-class UserViewSet(djoser.views.UserViewSet):
+class UserViewSet(CursorPaginationMixin, djoser.views.UserViewSet):
     """Viewset для запросов к пользователям."""
 
     queryset = Users.objects.all()
     serializer_class = UserSerializer
     permission_class = (AllowAny,)
     pagination_class = LimitOffsetPagination
+    cursor_pagination_class = UsersCursorPagination
 
     def get_queryset(self):
         if self.action == 'list':
@@ -107,18 +138,55 @@ class UserViewSet(djoser.views.UserViewSet):
         queryset = Users.objects.filter(
             subscriptions_to_author__subscriber=self.request.user
         ).annotate(
-            recipes_count=Count('recipes')
+            is_subscribed=Value(True)
         ).order_by('username')
-        paginator = self.pagination_class()
-        paginate_queryset = paginator.paginate_queryset(
-            queryset, request
+        paginate_queryset = self.paginate_queryset(queryset)
+        prefetch_related_objects(
+            paginate_queryset,
+            Prefetch(
+                'recipes',
+                queryset=self.get_limited_recipes(
+                    [author.id for author in paginate_queryset],
+                    SubscriberReadSerializer.get_recipes_limit(request)
+                ),
+                to_attr='limited_recipes'
+            )
         )
         serializer = SubscriberReadSerializer(
             paginate_queryset,
             many=True,
             context={'request': request}
         )
-        return paginator.get_paginated_response(serializer.data)
+        return self.get_paginated_response(serializer.data)
+
+    @staticmethod
+    def get_limited_recipes(author_ids, limit):
+        """
+        Рецепты авторов, не больше limit последних на каждого,
+        одним запросом с ROW_NUMBER() OVER (PARTITION BY author_id).
+        Порядок (pub_date, id) тот же, что в окне и индексе
+        recipes_pub_date_id_idx.
+        """
+        queryset = Recipes.objects.only(
+            'id', 'author_id', 'name', 'image', 'cooking_time', 'pub_date'
+        ).order_by('-pub_date', '-id')
+        if limit is None:
+            return queryset
+        ranked = Recipes.objects.filter(
+            author_id__in=author_ids
+        ).annotate(
+            recipe_rank=Window(
+                RowNumber(),
+                partition_by=F('author_id'),
+                order_by=(F('pub_date').desc(), F('id').desc())
+            )
+        ).order_by().values('id', 'recipe_rank')
+        sql, params = ranked.query.sql_with_params()
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT ranked.id FROM ({sql}) ranked '
+            'WHERE ranked.recipe_rank <= %s',
+            (*params, limit)
+        ))
 
     @action(
         methods=('post',),
@@ -161,39 +229,131 @@ class UserViewSet(djoser.views.UserViewSet):
         )
 
 
-class TagsViewSet(viewsets.ReadOnlyModelViewSet):
+class TagsViewSet(CachedListMixin, viewsets.ReadOnlyModelViewSet):
     """Viewset для запросов к тегам."""
 
+    cache_namespace = 'tags'
     queryset = Tags.objects.all()
     serializer_class = TagsSerializer
     pagination_class = None
 
 
-class IngredientsViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientsViewSet(CachedListMixin, viewsets.ReadOnlyModelViewSet):
     """Viewset для запросов к ингредиентам."""
 
+    cache_namespace = 'ingredients'
     queryset = Ingredients.objects.all()
     serializer_class = IngredientGetSerializer
     permission_classes = (AllowAny,)
     filterset_class = IngredientFilter
     pagination_class = None
 
-
-class RecipeViewSet(viewsets.ModelViewSet):
+    def list(self, request, *args, **kwargs):
+        """
+        Поиск по названию: на PostgreSQL с TRIGRAM_SEARCH — запросом
+        с ранжированием по сходству триграмм, иначе — по индексу в памяти.
+        """
+        name = request.query_params.get('name')
+        if (
+            name
+            and settings.INGREDIENT_SEARCH_INDEX
+            and not SearchService.is_available(Ingredients)
+        ):
+            return Response(ingredient_index.search(name))
+        return super().list(request, *args, **kwargs)
+
+
+class RecipeViewSet(
+    AnonymousCacheMixin,
+    CursorPaginationMixin,
+    viewsets.ModelViewSet
+):
     """Viewset для рецептов."""
 
-    queryset = Recipes.objects.select_related(
-        'author'
-    ).prefetch_related('tags', 'ingredients')
+    queryset = Recipes.objects.select_related('author')
     serializer_class = RecipesWriteSerializer
     permission_classes = (IsAuthenticatedOrReadOnly, OnlyAuthorOrReadOnly)
-    pagination_class = RecipesPageNumberPagination
+    pagination_class = CachedCountPagination
+    cursor_pagination_class = RecipesCursorPagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
+    anonymous_cache_namespace = 'recipes'
+    anonymous_cache_timeout = settings.RECIPES_CACHE_TIMEOUT
+    anonymous_cache_max_age = settings.RECIPES_CACHE_MAX_AGE
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_anonymous:
+            return queryset
+        return queryset.annotate(
+            is_favorited=Exists(
+                Favourites.objects.filter(
+                    user=user,
+                    recipe=OuterRef('pk')
+                )
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCard.objects.filter(
+                    user=user,
+                    recipe=OuterRef('pk')
+                )
+            ),
+            is_author_subscribed=Exists(
+                Subscribers.objects.filter(
+                    subscriber=user,
+                    author=OuterRef('author')
+                )
+            )
+        )
+
+    def get_serializer_class(self):
+        if self.request.method in SAFE_METHODS:
+            return RecipesReadSerializer
+        return super().get_serializer_class()
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    def handle_exception(self, exc):
+        """
+        Ошибки выгрузки списка покупок, включая неизвестный ?format=,
+        отдаются в JSON, а не в формате файла.
+        """
+        if self.action == 'get_shopping_card':
+            renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+            self.request.accepted_renderer = renderer
+            self.request.accepted_media_type = renderer.media_type
+        return super().handle_exception(exc)
+
+    @action(
+        methods=('post',),
+        detail=False,
+        permission_classes=(IsAuthenticated,)
+    )
+    def bulk(self, request):
+        """Создание пакета рецептов одним запросом."""
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False
+        )
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(
+        methods=('get',),
+        detail=False,
+        permission_classes=(IsAuthenticated,)
+    )
+    def feed(self, request):
+        """Лента рецептов авторов из подписок пользователя."""
+        paginator = FeedCursorPagination()
+        page = paginator.paginate_queryset(
+            self.get_queryset(), request, self
+        )
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     @action(
         methods=('get',),
         detail=True,
@@ -215,19 +375,15 @@ class RecipeViewSet(viewsets.ModelViewSet):
         )
 
     @staticmethod
-    def render_shopping_cart(ingredients):
-        lines = []
-        for ingredient in ingredients:
-            name = ingredient['name']
-            unit = ingredient['measurement_unit']
-            amount = ingredient['total_amount']
-            lines.append(f'- {name} ({amount} {unit})')
-        return '\n'.join(lines)
+    def render_shopping_cart(ingredients, renderer):
+        """Построчно формирует файл списка покупок в формате renderer."""
+        return renderer.stream(ingredients)
 
     @action(
         methods=('get',),
         detail=False,
         permission_classes=(IsAuthenticated,),
+        renderer_classes=tuple(shopping_cart_renderers.values()),
         url_path='download_shopping_cart'
     )
     def get_shopping_card(self, request):
@@ -239,20 +395,20 @@ class RecipeViewSet(viewsets.ModelViewSet):
             measurement_unit=F('ingredient__measurement_unit')
         ).annotate(
             total_amount=Sum('amount')
-        ).order_by('name')
-
-        shopping_cart = self.render_shopping_cart(ingredients)
-        filename = f'Список покупок для {request.user.first_name}.txt'
-        buffer = BytesIO()
-        buffer.write(shopping_cart.encode('utf-8'))
-        buffer.seek(0)
-
-        return FileResponse(
-            buffer,
-            content_type='text/plain',
-            as_attachment=True,
-            filename=filename
+        ).order_by('name').iterator()
+
+        renderer = request.accepted_renderer
+        filename = quote(
+            f'Список покупок для {request.user.first_name}.{renderer.format}'
         )
+        response = StreamingHttpResponse(
+            self.render_shopping_cart(ingredients, renderer),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
+        )
+        response['Content-Disposition'] = (
+            f"attachment; filename*=utf-8''{filename}"
+        )
+        return response
 
     @staticmethod
     def create_object(request, serializer_class, pk):
@@ -313,3 +469,10 @@ class RecipeViewSet(viewsets.ModelViewSet):
     @favorite_add.mapping.delete
     def favorite_del(self, request, pk):
         return self.delete_object(request, Favourites, pk)
+
+
+@api_view(('GET',))
+@permission_classes((IsAdminUser,))
+def short_link_stats(request):
+    """Счётчики кэша коротких ссылок текущего процесса."""
+    return Response(short_link_resolver.stats())
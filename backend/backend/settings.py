@@ -68,22 +68,31 @@ TEMPLATES = [
 WSGI_APPLICATION = 'backend.wsgi.application'
 
 
-# if not os.getenv('USE_POSTGRES', 'False') == 'True':
-#     DATABASES = {
-#         'default': {
-#             'ENGINE': 'django.db.backends.sqlite3',
-#             'NAME': BASE_DIR / 'db.sqlite3',
-#         }
-#     }
-# else:
-DATABASES = {
+if os.getenv('USE_POSTGRES', 'True') == 'True':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'foodgram'),
+            'USER': os.getenv('POSTGRES_USER', 'foodgram_user'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'foodgram_password'),
+            'HOST': os.getenv('HOST', 'db'),
+            'PORT': os.getenv('PORT', '5432')
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': os.getenv('POSTGRES_DB', 'foodgram'),
-        'USER': os.getenv('POSTGRES_USER', 'foodgram_user'),
-        'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'foodgram_password'),
-        'HOST': os.getenv('HOST', 'db'),
-        'PORT': os.getenv('PORT', '5432')
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'foodgram'),
     }
 }
 
@@ -132,6 +141,10 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.TokenAuthentication',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 6,
     'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend',)
@@ -139,6 +152,35 @@ REST_FRAMEWORK = {
 }
 
 
+# Поиск ингредиентов по названию. Если доступно ранжирование
+# по триграммам (TRIGRAM_SEARCH на PostgreSQL), поиск идёт запросом к БД,
+# иначе — по индексу в памяти процесса, если INGREDIENT_SEARCH_INDEX.
+INGREDIENT_SEARCH_INDEX = os.getenv('INGREDIENT_SEARCH_INDEX', 'True') == 'True'
+
+TRIGRAM_SEARCH = os.getenv('TRIGRAM_SEARCH', 'True') == 'True'
+
+SHORT_LINK_CACHE_SIZE = int(os.getenv('SHORT_LINK_CACHE_SIZE', 10000))
+SHORT_LINK_CACHE_TIMEOUT = int(os.getenv('SHORT_LINK_CACHE_TIMEOUT', 3600))
+SHORT_LINK_NEGATIVE_TIMEOUT = int(os.getenv('SHORT_LINK_NEGATIVE_TIMEOUT', 60))
+SHORT_LINK_SHARED_CACHE = os.getenv('SHORT_LINK_SHARED_CACHE', 'True') == 'True'
+
+RECIPES_COUNT_CACHE_TIMEOUT = int(os.getenv('RECIPES_COUNT_CACHE_TIMEOUT', 60))
+RECIPES_COUNT_ESTIMATE_THRESHOLD = int(
+    os.getenv('RECIPES_COUNT_ESTIMATE_THRESHOLD', 100000)
+)
+
+RECIPES_CACHE_TIMEOUT = int(os.getenv('RECIPES_CACHE_TIMEOUT', 300))
+RECIPES_CACHE_MAX_AGE = int(os.getenv('RECIPES_CACHE_MAX_AGE', 60))
+RECIPE_FRAGMENT_TIMEOUT = int(os.getenv('RECIPE_FRAGMENT_TIMEOUT', 3600))
+
+FAST_READ_SERIALIZERS = os.getenv('FAST_READ_SERIALIZERS', 'True') == 'True'
+
+RECIPES_BULK_MAX_SIZE = int(os.getenv('RECIPES_BULK_MAX_SIZE', 100))
+
+FEED_FANOUT_THRESHOLD = int(os.getenv('FEED_FANOUT_THRESHOLD', 10000))
+FEED_BATCH_SIZE = int(os.getenv('FEED_BATCH_SIZE', 1000))
+
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 
 DJOSER = {
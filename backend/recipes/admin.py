@@ -12,6 +12,7 @@ from .models import (
     ShoppingCard,
     Tags
 )
+from .services.search_service import SearchService
 
 
 @admin.register(Ingredients)
@@ -59,6 +60,18 @@ class RecipeAdmin(admin.ModelAdmin):
     list_filter = ('tags',)
     filter_horizontal = ('tags',)
 
+    def get_ordering(self, request):
+        ordering = super().get_ordering(request)
+        search_term = request.GET.get('q')
+        if search_term and SearchService.is_available(self.model):
+            return (
+                SearchService.similarity(
+                    search_term, 'name', 'author__username'
+                ).desc(),
+                *(ordering or self.model._meta.ordering)
+            )
+        return ordering
+
     def save_formset(self, request, form, formset, change):
         return super().save_formset(request, form, formset, change)
 
@@ -87,7 +100,7 @@ class RecipeAdmin(admin.ModelAdmin):
 
     @admin.display(description='В избранном')
     def get_count_favorites(self, obj):
-        return obj.favourites_set.all().count()
+        return obj.favorites_count
 
 
 @admin.register(Tags)
@@ -4,3 +4,6 @@ TAG_LENGTH = 32
 RECIPE_NAME_LENGTH = 256
 MIN_VALIDATE_INTEGER = 1
 LEN_NAME = 20
+SHORT_LINK_LENGTH = 6
+SHORT_LINK_MAX_LENGTH = 16
+SHORT_LINK_ATTEMPTS = 10
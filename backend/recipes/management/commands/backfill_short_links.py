@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from recipes.models import Recipes
+from recipes.services.link_service import LinkService
+
+
+class Command(BaseCommand):
+    help = 'Создает короткие ссылки для рецептов, у которых их нет'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Размер пакета обновления. По умолчанию: 1000'
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs['batch_size']
+        missing = Recipes.objects.filter(
+            Q(short_link__isnull=True) | Q(short_link='')
+        ).only('id')
+        updated = 0
+        while True:
+            recipes = list(missing[:batch_size])
+            if not recipes:
+                break
+            short_links = LinkService.generate_unique_short_links(
+                Recipes.objects.all(), len(recipes)
+            )
+            for recipe, short_link in zip(recipes, short_links):
+                recipe.short_link = short_link
+            Recipes.objects.bulk_update(recipes, ('short_link',))
+            updated += len(recipes)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Создано коротких ссылок: {updated}.')
+        )
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.services.backup_service import BACKUP_MODELS, BackupService
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает бэкап данных: по сжатому NDJSON-файлу на модель. '
+        'Файлы изображений не копируются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'directory',
+            nargs='?',
+            default='backup',
+            help='Каталог для файлов бэкапа. По умолчанию: backup'
+        )
+        parser.add_argument(
+            '--models',
+            nargs='+',
+            choices=tuple(BACKUP_MODELS),
+            default=tuple(BACKUP_MODELS),
+            help='Модели для бэкапа. По умолчанию: все'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=(
+                'Записей, читаемых из БД за раз. '
+                f'По умолчанию: {DEFAULT_CHUNK_SIZE}'
+            )
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Число процессов, по модели на процесс. По умолчанию: 1'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1 or options['processes'] < 1:
+            raise CommandError(
+                'Размер пакета и число процессов должны быть больше нуля.'
+            )
+        if not BackupService.is_snapshot_shared(options['processes']):
+            self.stderr.write(self.style.WARNING(
+                'Процессы читают таблицы в разные моменты: бэкап может '
+                'оказаться несогласованным. Согласованный бэкап: '
+                '--processes 1 или PostgreSQL.'
+            ))
+        started = time.perf_counter()
+        try:
+            for label, count in BackupService.backup(
+                options['models'],
+                options['directory'],
+                options['chunk_size'],
+                options['processes']
+            ):
+                self.stdout.write(f'{label}: записей {count}.')
+        except OSError as e:
+            raise CommandError(f'Не удалось записать бэкап: {e}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Бэкап сохранен в "{options["directory"]}" '
+            f'за {time.perf_counter() - started:.2f} с.'
+        ))
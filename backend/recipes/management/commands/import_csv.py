@@ -1,13 +1,23 @@
-import csv
+import time
 from pathlib import Path
 
 from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
 
-from recipes.models import Ingredients
+from recipes.services.import_service import (
+    FORMATS,
+    IMPORT_TARGETS,
+    ImportService
+)
+
+DEFAULT_BATCH_SIZE = 1000
 
 
 class Command(BaseCommand):
-    help = 'Импорт данных из CSV файла'
+    help = (
+        'Импорт ингредиентов или тегов из CSV, JSON или NDJSON файла. '
+        'Файл читается пакетами, существующие записи обновляются.'
+    )
 
     def add_arguments(self, parser):
         project_root = Path(__file__).resolve(
@@ -18,41 +28,70 @@ class Command(BaseCommand):
             type=str,
             nargs='?',
             default=data_root,
-            help='Укажите путь к CSV файлу. По умолчанию: data/ingredients.csv'
+            help='Укажите путь к файлу. По умолчанию: data/ingredients.csv'
+        )
+        parser.add_argument(
+            '--model',
+            choices=tuple(IMPORT_TARGETS),
+            default='ingredients',
+            help=(
+                'Что импортировать: ингредиенты обновляются по name, '
+                'теги по slug. По умолчанию: ingredients'
+            )
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Формат файла. По умолчанию: по расширению файла'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Строк в пакете. По умолчанию: {DEFAULT_BATCH_SIZE}'
         )
 
     def handle(self, *args, **kwargs):
-        csv_file_path = kwargs['csv_file']
-
+        file_path = Path(kwargs['csv_file'])
+        if kwargs['batch_size'] < 1:
+            raise CommandError('Размер пакета должен быть больше нуля.')
         try:
-            with open(csv_file_path, 'r', encoding='utf-8') as file:
-                self.stdout.write(f'Открываем файл: {csv_file_path}')
-                csv_reader = csv.reader(file)
-                ingredients = []
-                for name, unit in csv_reader:
-                    if name and unit:
-                        ingredients.append(Ingredients(
-                            name=name,
-                            measurement_unit=unit,
-                        ))
-                    else:
-                        continue
-
-                Ingredients.objects.bulk_create(
-                    ingredients,
-                    ignore_conflicts=True
-                )
-
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        'Данные успешно импортированы.'
-                    )
+            file_format = ImportService.get_format(
+                file_path, kwargs['format']
+            )
+            with open(file_path, 'r', encoding='utf-8', newline='') as file:
+                self.stdout.write(f'Открываем файл: {file_path}')
+                self.import_file(
+                    kwargs['model'], file, file_format, kwargs['batch_size']
                 )
-
         except FileNotFoundError:
             raise CommandError(
-                f'Файл {csv_file_path} не найден. '
+                f'Файл {file_path} не найден. '
                 'Убедитесь, что путь указан правильно.'
             )
-        except Exception as e:
+        except (ValueError, DatabaseError) as e:
             raise CommandError(f'Произошла ошибка: {e}')
+
+    def import_file(self, model, file, file_format, batch_size):
+        started = time.perf_counter()
+        total = created = updated = 0
+        for number, (rows, chunk_created, chunk_updated) in enumerate(
+            ImportService.run(model, file, file_format, batch_size), 1
+        ):
+            total += rows
+            created += chunk_created
+            updated += chunk_updated
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'Пакет {number}: строк {rows}, создано {chunk_created}, '
+                f'обновлено {chunk_updated}; всего {total}, '
+                f'{total / elapsed:.0f} строк/с'
+            )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Данные успешно импортированы: строк {total}, '
+                f'создано {created}, обновлено {updated} '
+                f'за {elapsed:.2f} с ({total / elapsed:.0f} строк/с).'
+            )
+        )
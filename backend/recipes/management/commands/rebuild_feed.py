@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from recipes.services.feed_service import FeedService
+
+
+class Command(BaseCommand):
+    help = 'Заново заполняет ленты подписок'
+
+    def handle(self, *args, **kwargs):
+        count = FeedService.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f'Ленты заполнены, записей: {count}.')
+        )
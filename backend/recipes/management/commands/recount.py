@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import Favourites, Recipes, ShoppingCard
+from recipes.services.counter_service import CounterService
+from users.models import Subscribers, Users
+
+COUNTERS = (
+    (Users, 'recipes_count', Recipes, 'author'),
+    (Users, 'subscribers_count', Subscribers, 'author'),
+    (Recipes, 'favorites_count', Favourites, 'recipe'),
+    (Recipes, 'in_carts_count', ShoppingCard, 'recipe'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики'
+
+    def handle(self, *args, **kwargs):
+        for model, field, related_model, related_field in COUNTERS:
+            updated = CounterService.recount(
+                model, field, related_model, related_field
+            )
+            self.stdout.write(
+                f'{model.__name__}.{field}: обновлено строк {updated}.'
+            )
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны.'))
@@ -0,0 +1,61 @@
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from recipes.services.backup_service import BACKUP_MODELS, BackupService
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Восстанавливает данные из бэкапа команды backup '
+        'в пустые таблицы и заново строит ленты подписок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'directory',
+            nargs='?',
+            default='backup',
+            help='Каталог с файлами бэкапа. По умолчанию: backup'
+        )
+        parser.add_argument(
+            '--models',
+            nargs='+',
+            choices=tuple(BACKUP_MODELS),
+            default=tuple(BACKUP_MODELS),
+            help='Модели для восстановления. По умолчанию: все'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=(
+                'Записей в одном bulk_create. '
+                f'По умолчанию: {DEFAULT_BATCH_SIZE}'
+            )
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пакета должен быть больше нуля.')
+        # Порядок восстановления задаётся BACKUP_MODELS.
+        labels = [
+            label for label in BACKUP_MODELS if label in options['models']
+        ]
+        started = time.perf_counter()
+        try:
+            for label, count in BackupService.restore(
+                labels, options['directory'], options['batch_size']
+            ):
+                self.stdout.write(f'{label}: записей {count}.')
+        except FileNotFoundError as e:
+            raise CommandError(f'Файл бэкапа не найден: {e.filename}')
+        except (OSError, ValueError, ValidationError, DatabaseError) as e:
+            raise CommandError(f'Произошла ошибка: {e}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные восстановлены за {time.perf_counter() - started:.2f} с.'
+        ))
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+INDEXES = (
+    (
+        'recipes_ingredients_name_trgm',
+        'recipes_ingredients',
+        'USING gin (UPPER(name) gin_trgm_ops)'
+    ),
+    (
+        'recipes_ingredients_name_upper',
+        'recipes_ingredients',
+        '(UPPER(name) text_pattern_ops)'
+    ),
+    (
+        'recipes_recipes_name_trgm',
+        'recipes_recipes',
+        'USING gin (UPPER(name) gin_trgm_ops)'
+    ),
+    (
+        'recipes_recipes_name_upper',
+        'recipes_recipes',
+        '(UPPER(name) text_pattern_ops)'
+    ),
+)
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, definition in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
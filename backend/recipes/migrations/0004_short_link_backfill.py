@@ -0,0 +1,47 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+from recipes.services.link_service import LinkService
+
+
+def fill_short_links(apps, schema_editor):
+    """Заполняет пустые и повторяющиеся короткие ссылки новыми."""
+    Recipes = apps.get_model('recipes', 'Recipes')
+    Recipes.objects.filter(short_link='').update(short_link=None)
+    duplicates = Recipes.objects.exclude(
+        short_link__isnull=True
+    ).order_by().values('short_link').annotate(
+        count=Count('id')
+    ).filter(count__gt=1).values_list('short_link', flat=True)
+    recipes = [
+        recipe
+        for short_link in duplicates
+        for recipe in Recipes.objects.filter(
+            short_link=short_link
+        ).order_by('id')[1:]
+    ]
+    recipes += list(Recipes.objects.filter(short_link__isnull=True))
+    if not recipes:
+        return
+    short_links = LinkService.generate_unique_short_links(
+        Recipes.objects.all(), len(recipes)
+    )
+    for recipe, short_link in zip(recipes, short_links):
+        recipe.short_link = short_link
+    Recipes.objects.bulk_update(recipes, ('short_link',), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipes',
+            name='short_link',
+            field=models.CharField(blank=True, editable=False, max_length=16, null=True, verbose_name='Короткая ссылка'),
+        ),
+        migrations.RunPython(fill_short_links, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_short_link_backfill'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipes',
+            name='short_link',
+            field=models.CharField(blank=True, editable=False, max_length=16, null=True, unique=True, verbose_name='Короткая ссылка'),
+        ),
+    ]
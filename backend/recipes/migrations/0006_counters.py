@@ -0,0 +1,39 @@
+# Generated by Django 3.2 on 2026-10-17 06:02
+
+from django.db import migrations, models
+
+from recipes.services.counter_service import CounterService
+
+
+def recount(apps, schema_editor):
+    Users = apps.get_model('users', 'Users')
+    Subscribers = apps.get_model('users', 'Subscribers')
+    Recipes = apps.get_model('recipes', 'Recipes')
+    Favourites = apps.get_model('recipes', 'Favourites')
+    ShoppingCard = apps.get_model('recipes', 'ShoppingCard')
+    CounterService.recount(Users, 'recipes_count', Recipes, 'author')
+    CounterService.recount(Users, 'subscribers_count', Subscribers, 'author')
+    CounterService.recount(Recipes, 'favorites_count', Favourites, 'recipe')
+    CounterService.recount(Recipes, 'in_carts_count', ShoppingCard, 'recipe')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_alter_recipes_short_link'),
+        ('users', '0003_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipes',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В избранном'),
+        ),
+        migrations.AddField(
+            model_name='recipes',
+            name='in_carts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В списках покупок'),
+        ),
+        migrations.RunPython(recount, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipes_pub_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS recipes_recipes_tags_tag_recipe '
+            'ON recipes_recipes_tags (tags_id, recipes_id)',
+            'DROP INDEX IF EXISTS recipes_recipes_tags_tag_recipe',
+        ),
+    ]
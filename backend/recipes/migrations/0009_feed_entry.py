@@ -0,0 +1,67 @@
+# Generated by Django 3.2 on 2026-10-17 06:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_feed(apps, schema_editor):
+    FeedEntry = apps.get_model('recipes', 'FeedEntry')
+    Recipes = apps.get_model('recipes', 'Recipes')
+    Subscribers = apps.get_model('users', 'Subscribers')
+    subscriptions = Subscribers.objects.filter(
+        author__subscribers_count__lt=settings.FEED_FANOUT_THRESHOLD
+    ).values_list('subscriber_id', 'author_id')
+    for subscriber_id, author_id in subscriptions.iterator():
+        FeedEntry.objects.bulk_create(
+            (
+                FeedEntry(
+                    user_id=subscriber_id,
+                    author_id=author_id,
+                    recipe_id=recipe_id,
+                    pub_date=pub_date
+                )
+                for recipe_id, pub_date in Recipes.objects.filter(
+                    author_id=author_id
+                ).values_list('id', 'pub_date').iterator()
+            ),
+            batch_size=settings.FEED_BATCH_SIZE
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0008_recipes_tags_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to='recipes.recipes', verbose_name='Рецепт')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to=settings.AUTH_USER_MODEL, verbose_name='Подписчик')),
+            ],
+            options={
+                'verbose_name': 'Запись ленты',
+                'verbose_name_plural': 'Записи ленты',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['user', '-pub_date', '-recipe'], name='recipes_feed_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['user', 'author'], name='recipes_feed_user_author_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='feedentry',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_feed_entry'),
+        ),
+        migrations.RunPython(fill_feed, migrations.RunPython.noop),
+    ]
@@ -8,8 +8,10 @@ from .constaints import (
     MEASUREMENT_LENGTH,
     MIN_VALIDATE_INTEGER,
     RECIPE_NAME_LENGTH,
+    SHORT_LINK_MAX_LENGTH,
     TAG_LENGTH
 )
+from .services.counter_service import CounterFieldsMixin, CounterQuerySet
 from .services.link_service import LinkService
 from users.models import Users
 
@@ -68,7 +70,7 @@ class Tags(models.Model):
         return self.slug[:LEN_NAME]
 
 
-class Recipes(models.Model):
+class Recipes(CounterFieldsMixin, models.Model):
     """Модель рецептов."""
 
     author = models.ForeignKey(
@@ -106,18 +108,46 @@ class Recipes(models.Model):
         default=timezone.now,
         verbose_name='Дата публикации'
     )
-    short_link = models.TextField(
+    short_link = models.CharField(
+        max_length=SHORT_LINK_MAX_LENGTH,
+        unique=True,
+        null=True,
+        blank=True,
+        editable=False,
         verbose_name='Короткая ссылка'
     )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В избранном'
+    )
+    in_carts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В списках покупок'
+    )
+
+    objects = CounterQuerySet.as_manager()
+
+    counter_fields = ('favorites_count', 'in_carts_count')
 
     def save(self, *args, **kwargs):
-        self.short_link = LinkService.generate_short_link()
+        if not self.short_link:
+            self.short_link = LinkService.generate_unique_short_link(
+                Recipes.objects.all()
+            )
         return super().save(*args, **kwargs)
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='recipes_pub_date_id_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name[:LEN_NAME]
@@ -212,3 +242,58 @@ class ShoppingCard(BaseUserRecipeRelation):
     class Meta(BaseUserRecipeRelation.Meta):
         verbose_name = 'Корзина покупок'
         verbose_name_plural = 'Корзина покупок'
+
+
+class FeedEntry(models.Model):
+    """
+    Запись ленты подписчика о новом рецепте автора.
+    Заполняется при публикации рецепта (fan-out on write).
+    """
+
+    user = models.ForeignKey(
+        Users,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        Users,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    recipe = models.ForeignKey(
+        Recipes,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Рецепт'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации'
+    )
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = (
+            models.UniqueConstraint(
+                fields=(
+                    'user',
+                    'recipe'
+                ),
+                name='unique_feed_entry'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-recipe'),
+                name='recipes_feed_user_date_idx'
+            ),
+            models.Index(
+                fields=('user', 'author'),
+                name='recipes_feed_user_author_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user} - {self.recipe}'
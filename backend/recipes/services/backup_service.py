@@ -0,0 +1,231 @@
+import gzip
+import json
+from contextlib import ExitStack, contextmanager
+from datetime import date, datetime, time
+from decimal import Decimal
+from itertools import islice
+from multiprocessing import get_context
+from pathlib import Path
+from uuid import UUID
+
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+
+from recipes.models import (
+    Favourites,
+    Ingredients,
+    Recipes,
+    RecipesIngredients,
+    ShoppingCard,
+    Tags
+)
+from .count_service import RECIPES_COUNT_NAMESPACE
+from .feed_service import FeedService
+from .fragment_service import FRAGMENTS_NAMESPACE
+from .version_service import VersionService
+from users.models import Subscribers, Users
+
+# Модели в порядке восстановления: сначала те, на которые ссылаются.
+# Ленты подписок не сохраняются, они строятся заново после restore.
+BACKUP_MODELS = {
+    model._meta.label_lower: model
+    for model in (
+        Users,
+        Ingredients,
+        Tags,
+        Recipes,
+        Recipes.tags.through,
+        RecipesIngredients,
+        Favourites,
+        ShoppingCard,
+        Subscribers,
+    )
+}
+
+FILE_SUFFIX = '.ndjson.gz'
+SNAPSHOT_ISOLATION = 'ISOLATION LEVEL REPEATABLE READ READ ONLY'
+CACHE_NAMESPACES = (
+    'ingredients',
+    'tags',
+    'recipes',
+    FRAGMENTS_NAMESPACE,
+    RECIPES_COUNT_NAMESPACE,
+)
+
+
+def encode_value(value):
+    """Значения, которых нет в JSON; время — без потери микросекунд."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f'Тип {type(value).__name__} не сериализуется в JSON.')
+
+
+def get_fields(model):
+    return model._meta.concrete_fields
+
+
+def backup_model(label, directory, chunk_size, snapshot=None):
+    """
+    Записывает таблицу модели в directory/<label>.ndjson.gz,
+    по строке JSON на запись. Возвращает число записей.
+    snapshot — снимок PostgreSQL из pg_export_snapshot(),
+    таблица читается в нём.
+    """
+    model = BACKUP_MODELS[label]
+    if snapshot is None:
+        return write_model(label, model, directory, chunk_size)
+    database = router.db_for_read(model)
+    with transaction.atomic(using=database):
+        with connections[database].cursor() as cursor:
+            cursor.execute(f'SET TRANSACTION {SNAPSHOT_ISOLATION}')
+            cursor.execute('SET TRANSACTION SNAPSHOT %s', (snapshot,))
+        return write_model(label, model, directory, chunk_size)
+
+
+def write_model(label, model, directory, chunk_size):
+    names = [field.attname for field in get_fields(model)]
+    rows = model.objects.order_by('pk').values_list(*names).iterator(
+        chunk_size=chunk_size
+    )
+    count = 0
+    path = Path(directory) / f'{label}{FILE_SUFFIX}'
+    with gzip.open(path, 'wt', encoding='utf-8') as file:
+        for row in rows:
+            file.write(json.dumps(
+                dict(zip(names, row)),
+                ensure_ascii=False,
+                default=encode_value
+            ))
+            file.write('\n')
+            count += 1
+    return label, count
+
+
+class BackupService:
+    """
+    Резервная копия данных в сжатых NDJSON-файлах, по файлу на модель.
+    Записи читаются и пишутся пакетами, поэтому расход памяти
+    не зависит от размера таблиц.
+    """
+
+    @staticmethod
+    def get_connection():
+        return connections[router.db_for_read(Users)]
+
+    @classmethod
+    def is_snapshot_shared(cls, processes):
+        """
+        Все модели сохраняются из одного снимка БД.
+        В одном процессе модели читаются в одной транзакции;
+        процессы используют общий снимок только в PostgreSQL,
+        в остальных БД каждый процесс читает свой.
+        """
+        return processes <= 1 or cls.get_connection().vendor == 'postgresql'
+
+    @staticmethod
+    @contextmanager
+    def export_snapshot(connection):
+        """
+        Открывает транзакцию REPEATABLE READ в отдельном соединении
+        и выдаёт её снимок; снимок доступен, пока открыта транзакция.
+        """
+        exporter = connection.get_new_connection(
+            connection.get_connection_params()
+        )
+        try:
+            exporter.autocommit = True
+            with exporter.cursor() as cursor:
+                cursor.execute(f'BEGIN {SNAPSHOT_ISOLATION}')
+                cursor.execute('SELECT pg_export_snapshot()')
+                yield cursor.fetchone()[0]
+        finally:
+            exporter.close()
+
+    @classmethod
+    def backup(cls, labels, directory, chunk_size, processes=1):
+        """
+        Сохраняет модели labels, при processes > 1 — в отдельных
+        процессах. Выдаёт метку модели и число записей.
+        """
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        connection = cls.get_connection()
+        if processes <= 1:
+            with transaction.atomic(using=connection.alias):
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute(f'SET TRANSACTION {SNAPSHOT_ISOLATION}')
+                for label in labels:
+                    yield backup_model(label, directory, chunk_size)
+            return
+        with ExitStack() as stack:
+            snapshot = None
+            if connection.vendor == 'postgresql':
+                snapshot = stack.enter_context(
+                    cls.export_snapshot(connection)
+                )
+            # Дочерние процессы открывают свои соединения с БД.
+            connections.close_all()
+            pool = stack.enter_context(get_context('fork').Pool(processes))
+            yield from pool.starmap(
+                backup_model,
+                (
+                    (label, directory, chunk_size, snapshot)
+                    for label in labels
+                )
+            )
+
+    @staticmethod
+    def read(path, model):
+        fields = {field.attname: field for field in get_fields(model)}
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    yield model(**{
+                        name: fields[name].to_python(value)
+                        for name, value in json.loads(line).items()
+                    })
+
+    @staticmethod
+    def reset_sequences(models):
+        """Сдвигает последовательности id после вставки с явными id."""
+        for database in {router.db_for_write(model) for model in models}:
+            connection = connections[database]
+            statements = connection.ops.sequence_reset_sql(
+                no_style(), models
+            )
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+
+    @staticmethod
+    def rebuild_caches():
+        """bulk_create не вызывает сигналы: ленты и кэши обновляются здесь."""
+        FeedService.rebuild()
+        for namespace in CACHE_NAMESPACES:
+            VersionService.bump_version(namespace)
+
+    @classmethod
+    def restore(cls, labels, directory, batch_size):
+        """
+        Загружает модели labels из directory пакетами bulk_create
+        в одной транзакции. Таблицы должны быть пустыми.
+        Выдаёт метку модели и число записей.
+        """
+        models = [BACKUP_MODELS[label] for label in labels]
+        with transaction.atomic():
+            for label, model in zip(labels, models):
+                instances = cls.read(
+                    Path(directory) / f'{label}{FILE_SUFFIX}', model
+                )
+                count = 0
+                while True:
+                    batch = list(islice(instances, batch_size))
+                    if not batch:
+                        break
+                    model.objects.bulk_create(batch)
+                    count += len(batch)
+                yield label, count
+            cls.reset_sequences(models)
+        cls.rebuild_caches()
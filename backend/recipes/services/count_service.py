@@ -0,0 +1,68 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+
+from .version_service import VersionService
+
+RECIPES_COUNT_NAMESPACE = 'recipes_count'
+
+
+class CountService:
+    """Кэшированное количество рецептов в отфильтрованной выборке."""
+
+    @staticmethod
+    def user_namespace(user_id):
+        return f'{RECIPES_COUNT_NAMESPACE}:{user_id}'
+
+    @classmethod
+    def get_key(cls, filters, user_id=None):
+        """
+        Ключ кэша по нормализованным параметрам фильтрации.
+        Для фильтров, зависящих от пользователя, в ключ входит
+        версия его избранного и списка покупок.
+        """
+        normalized = '&'.join(
+            f'{name}={",".join(sorted(values))}'
+            for name, values in sorted(filters.items())
+        )
+        versions = [str(VersionService.get_version(RECIPES_COUNT_NAMESPACE))]
+        if user_id is not None:
+            versions += [
+                str(user_id),
+                str(VersionService.get_version(cls.user_namespace(user_id)))
+            ]
+        digest = md5(normalized.encode()).hexdigest()
+        return f'{RECIPES_COUNT_NAMESPACE}:{":".join(versions)}:{digest}'
+
+    @staticmethod
+    def estimate(model):
+        """
+        Оценка числа строк таблицы из статистики PostgreSQL.
+        None, если оценка недоступна или меньше порога.
+        """
+        connection = connections[router.db_for_read(model)]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class '
+                'WHERE oid = %s::regclass',
+                (model._meta.db_table,)
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < settings.RECIPES_COUNT_ESTIMATE_THRESHOLD:
+            return None
+        return row[0]
+
+    @classmethod
+    def count(cls, queryset, key, filtered=True):
+        count = cache.get(key)
+        if count is None:
+            if not filtered:
+                count = cls.estimate(queryset.model)
+            if count is None:
+                count = queryset.count()
+            cache.set(key, count, settings.RECIPES_COUNT_CACHE_TIMEOUT)
+        return count
@@ -0,0 +1,122 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models import Count, F, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+
+class CounterService:
+    """Сервис денормализованных счётчиков."""
+
+    # Объекты, удаляемые в текущем потоке: связи, удаляемые вместе
+    # с ними каскадом, не меняют их счётчики.
+    _deleting = threading.local()
+
+    @classmethod
+    def change(cls, model, pk, field, delta):
+        """Атомарно изменяет счётчик на delta, не опуская ниже нуля."""
+        cls.change_many(model.objects.filter(pk=pk), field, delta)
+
+    @staticmethod
+    def change_many(queryset, field, delta):
+        """Изменяет счётчик у всех объектов queryset одним UPDATE."""
+        return queryset.update(**{field: Greatest(F(field) + delta, 0)})
+
+    @classmethod
+    def _get_deleting(cls):
+        if not hasattr(cls._deleting, 'objects'):
+            cls._deleting.objects = set()
+        return cls._deleting.objects
+
+    @classmethod
+    def mark_deleting(cls, instance):
+        cls._get_deleting().add((type(instance), instance.pk))
+
+    @classmethod
+    def unmark_deleting(cls, instance):
+        cls._get_deleting().discard((type(instance), instance.pk))
+
+    @classmethod
+    def is_deleting(cls, model, pk):
+        return (model, pk) in cls._get_deleting()
+
+    @classmethod
+    @contextmanager
+    def deleting(cls):
+        """
+        Снимает отметки, поставленные за время удаления, даже если
+        оно не удалось и post_delete не был отправлен.
+        """
+        marked = cls._get_deleting()
+        before = set(marked)
+        try:
+            yield
+        finally:
+            marked.intersection_update(before)
+
+    @staticmethod
+    def recount(model, field, related_model, related_field):
+        """Пересчитывает счётчик по связанной модели одним UPDATE."""
+        counts = related_model.objects.filter(
+            **{related_field: OuterRef('pk')}
+        ).order_by().values(related_field).annotate(
+            count=Count('pk')
+        ).values('count')
+        return model.objects.update(
+            **{field: Coalesce(Subquery(counts), 0)}
+        )
+
+
+class CounterQuerySet(QuerySet):
+
+    def delete(self):
+        with CounterService.deleting():
+            return super().delete()
+
+
+class CounterFieldsMixin:
+    """
+    Модель с денормализованными счётчиками counter_fields.
+    save() не перезаписывает счётчики устаревшими значениями объекта:
+    в UPDATE их нет, если они не указаны в update_fields явно,
+    а при вставке строки они сохраняются как есть.
+    Удаление снимает отметки CounterService.deleting(), менеджер
+    модели строится на CounterQuerySet.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if self.pk is None:
+            # Новый объект или копия (pk = None): связей у него нет.
+            for name in self.counter_fields:
+                setattr(self, name, self._meta.get_field(name).get_default())
+        elif (
+            not self._state.adding
+            and kwargs.get('update_fields') is None
+            and self.get_deferred_fields()
+        ):
+            # Django сохранит только загруженные поля; счётчики — нет.
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+                and field.attname not in deferred
+            ]
+        return super().save(*args, **kwargs)
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields,
+                   forced_update):
+        if update_fields is None:
+            values = [
+                value for value in values
+                if value[0].name not in self.counter_fields
+            ]
+        return super()._do_update(
+            base_qs, using, pk_val, values, update_fields, forced_update
+        )
+
+    def delete(self, *args, **kwargs):
+        with CounterService.deleting():
+            return super().delete(*args, **kwargs)
@@ -0,0 +1,149 @@
+from django.conf import settings
+from django.db import transaction
+
+from recipes.models import FeedEntry, Recipes
+from users.models import Subscribers, Users
+
+
+class FeedService:
+    """
+    Лента рецептов из подписок.
+    Рецепты авторов с числом подписчиков меньше FEED_FANOUT_THRESHOLD
+    записываются в ленты подписчиков при публикации, рецепты
+    остальных авторов выбираются при чтении ленты. Когда подписчиков
+    становится меньше порога, рецепты автора дописываются в ленты.
+    """
+
+    @staticmethod
+    def is_fan_out(author_id):
+        """Рецепты автора раскладываются по лентам подписчиков."""
+        subscribers_count = Users.objects.filter(
+            pk=author_id
+        ).values_list('subscribers_count', flat=True).first() or 0
+        return 0 < subscribers_count < settings.FEED_FANOUT_THRESHOLD
+
+    @staticmethod
+    def _create(entries):
+        FeedEntry.objects.bulk_create(
+            entries,
+            batch_size=settings.FEED_BATCH_SIZE,
+            ignore_conflicts=True
+        )
+
+    @classmethod
+    def fan_out(cls, recipe):
+        """Добавляет рецепт в ленты подписчиков автора."""
+        cls.fan_out_many((recipe,))
+
+    @classmethod
+    def fan_out_many(cls, recipes):
+        """Добавляет рецепты одного автора в ленты его подписчиков."""
+        if not recipes:
+            return
+        author_id = recipes[0].author_id
+        if not cls.is_fan_out(author_id):
+            return
+        subscriber_ids = list(Subscribers.objects.filter(
+            author_id=author_id
+        ).values_list('subscriber_id', flat=True))
+        cls._create(
+            FeedEntry(
+                user_id=subscriber_id,
+                author_id=author_id,
+                recipe_id=recipe.id,
+                pub_date=recipe.pub_date
+            )
+            for recipe in recipes
+            for subscriber_id in subscriber_ids
+        )
+
+    @classmethod
+    def backfill(cls, subscription):
+        """Добавляет в ленту подписчика рецепты нового автора."""
+        if not cls.is_fan_out(subscription.author_id):
+            return
+        cls._create(
+            FeedEntry(
+                user_id=subscription.subscriber_id,
+                author_id=subscription.author_id,
+                recipe_id=recipe_id,
+                pub_date=pub_date
+            )
+            for recipe_id, pub_date in Recipes.objects.filter(
+                author_id=subscription.author_id
+            ).values_list('id', 'pub_date').iterator()
+        )
+
+    @classmethod
+    def _fill(cls, subscriptions):
+        """
+        Записывает в ленты подписчиков рецепты авторов подписок
+        subscriptions, выбирая их одним запросом.
+        """
+        cls._create(
+            FeedEntry(
+                user_id=subscriber_id,
+                author_id=author_id,
+                recipe_id=recipe_id,
+                pub_date=pub_date
+            )
+            for subscriber_id, author_id, recipe_id, pub_date
+            in subscriptions.filter(
+                author__recipes__isnull=False
+            ).values_list(
+                'subscriber_id',
+                'author_id',
+                'author__recipes__id',
+                'author__recipes__pub_date'
+            ).iterator()
+        )
+
+    @classmethod
+    def resume_fan_out(cls, author_ids, excluded_subscriber_id=None):
+        """
+        Раскладывает по лентам рецепты авторов, у которых после отписки
+        стало FEED_FANOUT_THRESHOLD - 1 подписчиков: пока подписчиков
+        было больше, их рецепты выбирались при чтении и в ленты
+        не записывались. excluded_subscriber_id — удаляемый подписчик,
+        чья подписка ещё не удалена.
+        """
+        subscribers_count = settings.FEED_FANOUT_THRESHOLD - 1
+        if subscribers_count < 1:
+            return
+        cls._fill(Subscribers.objects.filter(
+            author__in=Users.objects.filter(
+                pk__in=author_ids, subscribers_count=subscribers_count
+            )
+        ).exclude(subscriber_id=excluded_subscriber_id))
+
+    @staticmethod
+    def remove(subscription):
+        """Удаляет из ленты подписчика рецепты автора."""
+        FeedEntry.objects.filter(
+            user_id=subscription.subscriber_id,
+            author_id=subscription.author_id
+        ).delete()
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Заполняет ленты заново по текущим подпискам в одной транзакции:
+        читатели не видят пустых или неполных лент.
+        """
+        with transaction.atomic():
+            FeedEntry.objects.all().delete()
+            cls._fill(Subscribers.objects.filter(
+                author__subscribers_count__gt=0,
+                author__subscribers_count__lt=(
+                    settings.FEED_FANOUT_THRESHOLD
+                )
+            ))
+            return FeedEntry.objects.count()
+
+    @staticmethod
+    def get_read_authors(user):
+        """Подзапрос авторов, рецепты которых выбираются при чтении."""
+        return Subscribers.objects.filter(
+            subscriber=user,
+            author__subscribers_count__gte=settings.FEED_FANOUT_THRESHOLD
+        ).values('author_id')
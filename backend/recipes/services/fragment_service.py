@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .version_service import VersionService
+
+FRAGMENTS_NAMESPACE = 'recipe_fragments'
+
+
+class RecipeFragmentService:
+    """
+    Кэш не зависящей от пользователя части представления рецепта.
+    Запись рецепта удаляется при его изменении, все записи сразу
+    сбрасываются увеличением версии FRAGMENTS_NAMESPACE.
+    """
+
+    @staticmethod
+    def _keys(recipe_ids):
+        version = VersionService.get_version(FRAGMENTS_NAMESPACE)
+        return {
+            f'{FRAGMENTS_NAMESPACE}:{version}:{recipe_id}': recipe_id
+            for recipe_id in recipe_ids
+        }
+
+    @classmethod
+    def get_many(cls, recipe_ids):
+        keys = cls._keys(recipe_ids)
+        return {
+            keys[key]: fragment
+            for key, fragment in cache.get_many(keys).items()
+        }
+
+    @classmethod
+    def set_many(cls, fragments):
+        keys = cls._keys(fragments)
+        cache.set_many(
+            {key: fragments[recipe_id] for key, recipe_id in keys.items()},
+            settings.RECIPE_FRAGMENT_TIMEOUT
+        )
+
+    @classmethod
+    def evict(cls, recipe_ids):
+        """
+        Удаляет записи сразу и ещё раз после фиксации транзакции,
+        чтобы не осталось представления, собранного до неё.
+        """
+        recipe_ids = list(recipe_ids)
+        if not recipe_ids:
+            return
+        cache.delete_many(cls._keys(recipe_ids))
+        transaction.on_commit(
+            lambda: cache.delete_many(cls._keys(recipe_ids))
+        )
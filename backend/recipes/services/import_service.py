@@ -0,0 +1,220 @@
+import csv
+import json
+from collections import namedtuple
+from io import StringIO
+from itertools import islice
+
+from django.db import connections, router, transaction
+
+from recipes.models import Ingredients, Tags
+from .fragment_service import FRAGMENTS_NAMESPACE
+from .version_service import VersionService
+
+READ_SIZE = 65536
+SEPARATORS = ' \t\r\n,'
+STAGING_TABLE = 'import_staging'
+
+# fields — порядок столбцов в CSV, key — поле, по которому
+# строки сопоставляются с существующими записями.
+ImportTarget = namedtuple('ImportTarget', ('model', 'key', 'fields'))
+
+IMPORT_TARGETS = {
+    'ingredients': ImportTarget(
+        Ingredients, 'name', ('name', 'measurement_unit')
+    ),
+    'tags': ImportTarget(Tags, 'slug', ('name', 'slug')),
+}
+
+FORMATS = ('csv', 'json', 'ndjson')
+
+
+def read_csv(file, fields):
+    for row in csv.reader(file):
+        if len(row) == len(fields):
+            yield dict(zip(fields, row))
+
+
+def read_ndjson(file, fields):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_json(file, fields):
+    """
+    Элементы JSON-массива по одному, без чтения файла целиком.
+    Файл читается блоками по READ_SIZE символов.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    for chunk in iter(lambda: file.read(READ_SIZE), ''):
+        buffer = chunk.lstrip()
+        if buffer:
+            break
+    if not buffer.startswith('['):
+        raise ValueError('Ожидается JSON-массив.')
+    position = 1
+    while True:
+        while position < len(buffer) and buffer[position] in SEPARATORS:
+            position += 1
+        if buffer[position:position + 1] == ']':
+            return
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = file.read(READ_SIZE)
+            if not chunk:
+                raise
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield item
+
+
+READERS = {'csv': read_csv, 'json': read_json, 'ndjson': read_ndjson}
+
+
+class ImportService:
+    """
+    Потоковый импорт ингредиентов и тегов.
+    Строки читаются пакетами по batch_size и добавляются или обновляются
+    по ключевому полю: в PostgreSQL через COPY во временную таблицу
+    и INSERT ... ON CONFLICT, в остальных БД через bulk_create
+    и bulk_update.
+    """
+
+    @staticmethod
+    def get_format(path, file_format=None):
+        file_format = file_format or path.suffix.lstrip('.').lower()
+        if file_format not in FORMATS:
+            raise ValueError(f'Неизвестный формат файла: {file_format}.')
+        return file_format
+
+    @staticmethod
+    def normalize(target, items):
+        """
+        Строки с непустыми полями target.fields.
+        Записи фикстур Django берутся из 'fields'.
+        """
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            item = item.get('fields', item)
+            row = {field: item.get(field) for field in target.fields}
+            if all(row.values()):
+                yield {field: str(value) for field, value in row.items()}
+
+    @staticmethod
+    def chunks(rows, batch_size):
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                return
+            yield chunk
+
+    @staticmethod
+    def _upsert_orm(target, rows):
+        update_fields = [
+            field for field in target.fields if field != target.key
+        ]
+        existing = target.model.objects.in_bulk(
+            list(rows), field_name=target.key
+        )
+        changed = []
+        for key, instance in existing.items():
+            row = rows[key]
+            if any(
+                getattr(instance, field) != row[field]
+                for field in update_fields
+            ):
+                for field in update_fields:
+                    setattr(instance, field, row[field])
+                changed.append(instance)
+        if changed:
+            target.model.objects.bulk_update(changed, update_fields)
+        created = target.model.objects.bulk_create(
+            target.model(**row)
+            for key, row in rows.items() if key not in existing
+        )
+        return len(created), len(changed)
+
+    @staticmethod
+    def _upsert_copy(target, rows, connection):
+        options = target.model._meta
+        quote = connection.ops.quote_name
+        columns = [
+            quote(options.get_field(field).column) for field in target.fields
+        ]
+        key = quote(options.get_field(target.key).column)
+        updates = [column for column in columns if column != key]
+        table = quote(options.db_table)
+        column_list = ', '.join(columns)
+        buffer = StringIO()
+        csv.writer(buffer).writerows(
+            [row[field] for field in target.fields] for row in rows.values()
+        )
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {STAGING_TABLE} AS '
+                f'SELECT {column_list} FROM {table} WITH NO DATA'
+            )
+            cursor.copy_expert(
+                f'COPY {STAGING_TABLE} ({column_list}) '
+                'FROM STDIN WITH (FORMAT csv)',
+                buffer
+            )
+            cursor.execute(
+                f'INSERT INTO {table} AS target ({column_list}) '
+                f'SELECT {column_list} FROM {STAGING_TABLE} '
+                f'ON CONFLICT ({key}) DO UPDATE SET '
+                + ', '.join(
+                    f'{column} = EXCLUDED.{column}' for column in updates
+                )
+                + ' WHERE ('
+                + ', '.join(f'target.{column}' for column in updates)
+                + ') IS DISTINCT FROM ('
+                + ', '.join(f'EXCLUDED.{column}' for column in updates)
+                + ') RETURNING xmax = 0'
+            )
+            inserted = [row[0] for row in cursor.fetchall()]
+            cursor.execute(f'DROP TABLE {STAGING_TABLE}')
+        created = sum(inserted)
+        return created, len(inserted) - created
+
+    @classmethod
+    def upsert(cls, target, chunk):
+        """
+        Добавляет и обновляет записи пакета.
+        Возвращает количество созданных и обновлённых записей.
+        """
+        # Повтор ключа внутри пакета: остаётся последняя строка.
+        rows = {row[target.key]: row for row in chunk}
+        database = router.db_for_write(target.model)
+        connection = connections[database]
+        with transaction.atomic(using=database):
+            if connection.vendor == 'postgresql':
+                return cls._upsert_copy(target, rows, connection)
+            return cls._upsert_orm(target, rows)
+
+    @staticmethod
+    def bump_versions(name):
+        """bulk-операции не вызывают сигналы, кэши сбрасываются здесь."""
+        for namespace in (name, 'recipes', FRAGMENTS_NAMESPACE):
+            VersionService.bump_version(namespace)
+
+    @classmethod
+    def run(cls, name, file, file_format, batch_size):
+        """Импортирует файл, выдавая статистику каждого пакета."""
+        target = IMPORT_TARGETS[name]
+        rows = cls.normalize(
+            target, READERS[file_format](file, target.fields)
+        )
+        changed = False
+        for chunk in cls.chunks(rows, batch_size):
+            created, updated = cls.upsert(target, chunk)
+            changed = changed or bool(created or updated)
+            yield len(chunk), created, updated
+        if changed:
+            cls.bump_versions(name)
@@ -0,0 +1,106 @@
+import threading
+from bisect import bisect_left
+
+from .version_service import VersionService
+
+TRIGRAM_LENGTH = 3
+
+
+def get_trigrams(value):
+    return {
+        value[index:index + TRIGRAM_LENGTH]
+        for index in range(len(value) - TRIGRAM_LENGTH + 1)
+    }
+
+
+class IngredientSearchIndex:
+    """
+    Индекс ингредиентов в памяти процесса.
+    Ищет по началу названия, затем по вхождению, без запросов к БД.
+    Перестраивается, когда меняется версия 'ingredients'.
+    """
+
+    namespace = 'ingredients'
+    fields = ('id', 'name', 'measurement_unit')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._index = None
+
+    def build(self):
+        """Загружает ингредиенты из БД и строит индекс."""
+        from recipes.models import Ingredients
+
+        rows = tuple(
+            Ingredients.objects.order_by('name').values(*self.fields)
+        )
+        names = tuple(row['name'].casefold() for row in rows)
+        ordered = sorted(range(len(names)), key=names.__getitem__)
+        trigrams = {}
+        for position, name in enumerate(names):
+            for trigram in get_trigrams(name):
+                trigrams.setdefault(trigram, []).append(position)
+        return {
+            'rows': rows,
+            'names': names,
+            'keys': tuple(names[position] for position in ordered),
+            'positions': tuple(ordered),
+            'trigrams': trigrams,
+        }
+
+    def _get_index(self):
+        version = VersionService.get_version(self.namespace)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._index = self.build()
+                    self._version = version
+        return self._index
+
+    @staticmethod
+    def _prefix_positions(index, value):
+        keys = index['keys']
+        positions = []
+        for number in range(bisect_left(keys, value), len(keys)):
+            if not keys[number].startswith(value):
+                break
+            positions.append(index['positions'][number])
+        return positions
+
+    @staticmethod
+    def _substring_positions(index, value):
+        names = index['names']
+        if len(value) < TRIGRAM_LENGTH:
+            candidates = range(len(names))
+        else:
+            postings = sorted(
+                (
+                    index['trigrams'].get(trigram, ())
+                    for trigram in get_trigrams(value)
+                ),
+                key=len
+            )
+            candidates = set(postings[0]).intersection(*postings[1:])
+        return [
+            position for position in candidates
+            if value in names[position]
+        ]
+
+    def search(self, value):
+        """
+        Возвращает ингредиенты, название которых начинается с value,
+        а затем те, в названии которых value встречается.
+        """
+        index = self._get_index()
+        value = value.casefold()
+        prefix = sorted(self._prefix_positions(index, value))
+        found = set(prefix)
+        contains = sorted(
+            position for position in self._substring_positions(index, value)
+            if position not in found
+        )
+        return [index['rows'][position] for position in prefix + contains]
+
+
+ingredient_index = IngredientSearchIndex()
@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+MISSING = 0
+
+
+class ShortLinkResolver:
+    """
+    Резолвер коротких ссылок в id рецепта.
+    Первый уровень — LRU-кэш процесса ограниченного размера,
+    второй — кэш Django. Неизвестные ссылки кэшируются на
+    negative_timeout секунд, чтобы перебор не доходил до БД.
+    """
+
+    def __init__(self, max_size, timeout, negative_timeout, shared):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.negative_timeout = negative_timeout
+        self.shared = shared
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ('local_hits', 'shared_hits', 'negative_hits', 'misses'), 0
+        )
+
+    @staticmethod
+    def _key(short_link):
+        return f'short-link:{short_link}'
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _get_local(self, short_link):
+        with self._lock:
+            entry = self._entries.get(short_link)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self._entries[short_link]
+                return None
+            self._entries.move_to_end(short_link)
+            return entry[0]
+
+    def _set_local(self, short_link, value, timeout):
+        with self._lock:
+            self._entries[short_link] = (value, time.monotonic() + timeout)
+            self._entries.move_to_end(short_link)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _load(self, short_link):
+        from recipes.models import Recipes
+
+        recipe_id = Recipes.objects.filter(
+            short_link=short_link
+        ).values_list('id', flat=True).first()
+        return MISSING if recipe_id is None else recipe_id
+
+    def resolve(self, short_link):
+        """Возвращает id рецепта или None, если ссылка неизвестна."""
+        value = self._get_local(short_link)
+        if value is not None:
+            self._count('negative_hits' if value == MISSING else 'local_hits')
+            return value or None
+        if self.shared:
+            value = cache.get(self._key(short_link))
+        if value is not None:
+            self._count(
+                'negative_hits' if value == MISSING else 'shared_hits'
+            )
+        else:
+            self._count('misses')
+            value = self._load(short_link)
+            if self.shared:
+                cache.set(
+                    self._key(short_link), value, self._get_timeout(value)
+                )
+        self._set_local(short_link, value, self._get_timeout(value))
+        return value or None
+
+    def _get_timeout(self, value):
+        return self.negative_timeout if value == MISSING else self.timeout
+
+    def evict(self, short_link):
+        with self._lock:
+            self._entries.pop(short_link, None)
+        if self.shared:
+            cache.delete(self._key(short_link))
+
+    def stats(self):
+        with self._lock:
+            return {**self._counters, 'size': len(self._entries)}
+
+
+short_link_resolver = ShortLinkResolver(
+    max_size=settings.SHORT_LINK_CACHE_SIZE,
+    timeout=settings.SHORT_LINK_CACHE_TIMEOUT,
+    negative_timeout=settings.SHORT_LINK_NEGATIVE_TIMEOUT,
+    shared=settings.SHORT_LINK_SHARED_CACHE
+)
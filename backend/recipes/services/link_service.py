@@ -1,4 +1,10 @@
-import uuid
+import secrets
+import string
+
+from recipes.constaints import SHORT_LINK_ATTEMPTS, SHORT_LINK_LENGTH
+
+ALPHABET = string.digits + string.ascii_letters
+CHECK_BATCH_SIZE = 500
 
 
 class LinkService:
@@ -6,5 +12,37 @@ class LinkService:
 
     @staticmethod
     def generate_short_link():
-        short_link = uuid.uuid4().hex[:5]
-        return f'{short_link}'
+        return ''.join(
+            secrets.choice(ALPHABET) for _ in range(SHORT_LINK_LENGTH)
+        )
+
+    @classmethod
+    def generate_unique_short_links(cls, queryset, count):
+        """
+        Генерирует count коротких ссылок, не занятых в queryset.
+        На каждую попытку — один запрос к уникальному индексу.
+        """
+        short_links = set()
+        for _ in range(SHORT_LINK_ATTEMPTS):
+            candidates = {
+                cls.generate_short_link()
+                for _ in range(count - len(short_links))
+            } - short_links
+            short_links |= candidates - cls._taken(queryset, candidates)
+            if len(short_links) == count:
+                return list(short_links)
+        raise ValueError('Не удалось создать уникальные короткие ссылки.')
+
+    @staticmethod
+    def _taken(queryset, candidates):
+        candidates = list(candidates)
+        taken = set()
+        for start in range(0, len(candidates), CHECK_BATCH_SIZE):
+            taken.update(queryset.filter(
+                short_link__in=candidates[start:start + CHECK_BATCH_SIZE]
+            ).values_list('short_link', flat=True))
+        return taken
+
+    @classmethod
+    def generate_unique_short_link(cls, queryset):
+        return cls.generate_unique_short_links(queryset, 1)[0]
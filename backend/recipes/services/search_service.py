@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db import connections, router
+from django.db.models.functions import Greatest
+
+
+class SearchService:
+    """Ранжирование поиска по сходству триграмм на PostgreSQL."""
+
+    @staticmethod
+    def is_available(model):
+        return (
+            settings.TRIGRAM_SEARCH
+            and connections[router.db_for_read(model)].vendor == 'postgresql'
+        )
+
+    @staticmethod
+    def similarity(value, *fields):
+        """Наибольшее сходство value с одним из полей."""
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        similarities = [TrigramSimilarity(field, value) for field in fields]
+        if len(similarities) == 1:
+            return similarities[0]
+        return Greatest(*similarities)
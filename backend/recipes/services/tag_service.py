@@ -0,0 +1,22 @@
+from django.core.cache import cache
+
+from .version_service import VersionService
+
+
+class TagService:
+    """Соответствие slug тега его id, кэшируемое до изменения тегов."""
+
+    @staticmethod
+    def get_slug_map():
+        key = f'tags:slugs:{VersionService.get_version("tags")}'
+        slug_map = cache.get(key)
+        if slug_map is None:
+            from recipes.models import Tags
+
+            slug_map = dict(Tags.objects.values_list('slug', 'id'))
+            cache.set(key, slug_map)
+        return slug_map
+
+    @classmethod
+    def get_choices(cls):
+        return [(slug, slug) for slug in cls.get_slug_map()]
@@ -0,0 +1,34 @@
+import time
+
+from django.core.cache import cache
+
+
+class VersionService:
+    """Сервис версий для инвалидации кэшей по пространствам имён."""
+
+    @staticmethod
+    def _key(namespace):
+        return f'version:{namespace}'
+
+    @staticmethod
+    def _initial():
+        return int(time.time() * 1000)
+
+    @classmethod
+    def get_version(cls, namespace):
+        key = cls._key(namespace)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, cls._initial(), timeout=None)
+            version = cache.get(key)
+        return version
+
+    @classmethod
+    def bump_version(cls, namespace):
+        key = cls._key(namespace)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            version = cls._initial()
+            cache.set(key, version, timeout=None)
+            return version
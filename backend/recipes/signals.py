@@ -0,0 +1,190 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete
+)
+from django.dispatch import receiver
+
+from .models import (
+    Favourites,
+    Ingredients,
+    Recipes,
+    RecipesIngredients,
+    ShoppingCard,
+    Tags
+)
+from .services.count_service import RECIPES_COUNT_NAMESPACE, CountService
+from .services.counter_service import CounterService
+from .services.feed_service import FeedService
+from .services.fragment_service import (
+    FRAGMENTS_NAMESPACE,
+    RecipeFragmentService
+)
+from .services.link_resolver import short_link_resolver
+from .services.version_service import VersionService
+from users.models import Users
+
+RELATION_COUNTERS = {
+    Favourites: 'favorites_count',
+    ShoppingCard: 'in_carts_count',
+}
+
+
+def bump_on_commit(namespace):
+    transaction.on_commit(lambda: VersionService.bump_version(namespace))
+
+
+@receiver((post_save, post_delete), sender=Ingredients)
+def ingredients_changed(sender, **kwargs):
+    bump_on_commit('ingredients')
+    bump_on_commit('recipes')
+    bump_on_commit(FRAGMENTS_NAMESPACE)
+
+
+@receiver((post_save, post_delete), sender=Tags)
+def tags_changed(sender, **kwargs):
+    bump_on_commit('tags')
+    bump_on_commit('recipes')
+    bump_on_commit(FRAGMENTS_NAMESPACE)
+
+
+@receiver((post_save, post_delete), sender=Recipes)
+@receiver((post_save, post_delete), sender=RecipesIngredients)
+def recipes_changed(sender, instance, **kwargs):
+    bump_on_commit('recipes')
+    RecipeFragmentService.evict(
+        (instance.pk if sender is Recipes else instance.recipe_id,)
+    )
+
+
+@receiver(post_save, sender=Users)
+def author_changed(sender, instance, created, update_fields=None,
+                   **kwargs):
+    """
+    Сбрасывает кэш рецептов, если изменились данные автора.
+    У нового пользователя рецептов нет; рецепты удалённого
+    удаляются каскадом и сбрасываются в recipes_changed.
+    """
+    changed = (
+        not created and instance.author_values_changed(update_fields)
+    )
+    instance.remember_author_values(update_fields)
+    if changed:
+        bump_on_commit('recipes')
+        RecipeFragmentService.evict(
+            instance.recipes.values_list('id', flat=True)
+        )
+
+
+@receiver((post_save, post_delete), sender=Recipes)
+def recipe_short_link_changed(sender, instance, created=True, **kwargs):
+    if created and instance.short_link:
+        transaction.on_commit(
+            lambda: short_link_resolver.evict(instance.short_link)
+        )
+
+
+@receiver(post_save, sender=Recipes)
+def recipe_created(sender, instance, created, **kwargs):
+    if created:
+        CounterService.change(Users, instance.author_id, 'recipes_count', 1)
+        bump_on_commit(RECIPES_COUNT_NAMESPACE)
+        FeedService.fan_out(instance)
+
+
+def recipes_bulk_created(recipes):
+    """
+    Обработка рецептов, созданных bulk_create без сигналов:
+    то же, что делают recipe_created и recipe_tags_changed.
+    """
+    authors = defaultdict(list)
+    for recipe in recipes:
+        authors[recipe.author_id].append(recipe)
+    for author_id, author_recipes in authors.items():
+        CounterService.change(
+            Users, author_id, 'recipes_count', len(author_recipes)
+        )
+        FeedService.fan_out_many(author_recipes)
+    bump_on_commit(RECIPES_COUNT_NAMESPACE)
+    bump_on_commit('recipes')
+    short_links = [recipe.short_link for recipe in recipes]
+    transaction.on_commit(
+        lambda: [short_link_resolver.evict(link) for link in short_links]
+    )
+
+
+@receiver(pre_delete, sender=Recipes)
+def recipe_deleting(sender, instance, **kwargs):
+    CounterService.mark_deleting(instance)
+
+
+@receiver(post_delete, sender=Recipes)
+def recipe_deleted(sender, instance, **kwargs):
+    if not CounterService.is_deleting(Users, instance.author_id):
+        CounterService.change(
+            Users, instance.author_id, 'recipes_count', -1
+        )
+    bump_on_commit(RECIPES_COUNT_NAMESPACE)
+    CounterService.unmark_deleting(instance)
+
+
+@receiver(pre_delete, sender=Users)
+def user_deleting(sender, instance, **kwargs):
+    """
+    Счётчики рецептов из избранного и списка покупок пользователя
+    уменьшаются здесь одним UPDATE на связь, а не по строке
+    при каскадном удалении.
+    """
+    CounterService.mark_deleting(instance)
+    for model, field in RELATION_COUNTERS.items():
+        CounterService.change_many(
+            Recipes.objects.filter(**{
+                f'{model._meta.model_name}_set__user': instance
+            }).exclude(author=instance),
+            field,
+            -1
+        )
+
+
+@receiver(post_delete, sender=Users)
+def user_deleted(sender, instance, **kwargs):
+    CounterService.unmark_deleting(instance)
+
+
+@receiver(m2m_changed, sender=Recipes.tags.through)
+def recipe_tags_changed(sender, instance, action, reverse, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_on_commit(RECIPES_COUNT_NAMESPACE)
+        bump_on_commit('recipes')
+        if reverse:
+            bump_on_commit(FRAGMENTS_NAMESPACE)
+        else:
+            RecipeFragmentService.evict((instance.pk,))
+
+
+@receiver(post_save, sender=Favourites)
+@receiver(post_save, sender=ShoppingCard)
+def recipe_relation_created(sender, instance, created, **kwargs):
+    if created:
+        CounterService.change(
+            Recipes, instance.recipe_id, RELATION_COUNTERS[sender], 1
+        )
+        bump_on_commit(CountService.user_namespace(instance.user_id))
+
+
+@receiver(post_delete, sender=Favourites)
+@receiver(post_delete, sender=ShoppingCard)
+def recipe_relation_deleted(sender, instance, **kwargs):
+    if (
+        CounterService.is_deleting(Recipes, instance.recipe_id)
+        or CounterService.is_deleting(Users, instance.user_id)
+    ):
+        return
+    CounterService.change(
+        Recipes, instance.recipe_id, RELATION_COUNTERS[sender], -1
+    )
+    bump_on_commit(CountService.user_namespace(instance.user_id))
@@ -1,10 +1,11 @@
-from django.http import HttpResponsePermanentRedirect
-from django.shortcuts import get_object_or_404
+from django.http import Http404, HttpResponsePermanentRedirect
 
-from .models import Recipes
+from .services.link_resolver import short_link_resolver
 
 
 def recipe_redirect(request, link):
-    recipe = get_object_or_404(Recipes, short_link=link)
-    recipe_url = f'/recipes/{recipe.id}/'
+    recipe_id = short_link_resolver.resolve(link)
+    if recipe_id is None:
+        raise Http404('Рецепт не найден.')
+    recipe_url = f'/recipes/{recipe_id}/'
     return HttpResponsePermanentRedirect(recipe_url)
@@ -0,0 +1,123 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+IMAGE = (
+    'data:image/gif;base64,'
+    'R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7'
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def make_user(django_user_model):
+    def make_user(number):
+        return django_user_model.objects.create_user(
+            email=f'user{number}@example.com',
+            username=f'user{number}',
+            first_name='Имя',
+            last_name='Фамилия',
+            password='password'
+        )
+    return make_user
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user(0)
+
+
+@pytest.fixture
+def author(make_user):
+    return make_user(1)
+
+
+@pytest.fixture
+def tags():
+    from recipes.models import Tags
+
+    return [
+        Tags.objects.create(name=f'Тег {number}', slug=f'tag{number}')
+        for number in range(3)
+    ]
+
+
+@pytest.fixture
+def ingredients():
+    from recipes.models import Ingredients
+
+    return [
+        Ingredients.objects.create(
+            name=f'Ингредиент {number}', measurement_unit='г'
+        )
+        for number in range(40)
+    ]
+
+
+@pytest.fixture
+def make_recipe(author, tags, ingredients):
+    from recipes.models import Recipes, RecipesIngredients
+
+    def make_recipe(number, recipe_author=None):
+        recipe = Recipes.objects.create(
+            author=recipe_author or author,
+            name=f'Рецепт {number}',
+            image='recipes_media/recipe.png',
+            text='Описание',
+            cooking_time=10
+        )
+        recipe.tags.set(tags[:number % len(tags) + 1])
+        RecipesIngredients.objects.bulk_create(
+            RecipesIngredients(recipe=recipe, ingredient=ingredient, amount=5)
+            for ingredient in ingredients[number % 10:number % 10 + 3]
+        )
+        return recipe
+    return make_recipe
+
+
+@pytest.fixture
+def recipes(make_recipe):
+    return [make_recipe(number) for number in range(12)]
+
+
+@pytest.fixture
+def recipe_payload(tags):
+    def recipe_payload(ingredient_ids, tag_ids=None):
+        return {
+            'ingredients': [
+                {'id': ingredient_id, 'amount': 10}
+                for ingredient_id in ingredient_ids
+            ],
+            'tags': tag_ids or [tag.id for tag in tags[:2]],
+            'image': IMAGE,
+            'name': 'Новый рецепт',
+            'text': 'Описание',
+            'cooking_time': 15,
+        }
+    return recipe_payload
+
+
+@pytest.fixture
+def anonymous_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}'
+    )
+    return client
@@ -0,0 +1,6 @@
+"""Настройки тестов: по умолчанию SQLite, PostgreSQL — с USE_POSTGRES=True."""
+import os
+
+os.environ.setdefault('USE_POSTGRES', 'False')
+
+from backend.settings import *  # noqa
@@ -0,0 +1,49 @@
+import pytest
+
+from recipes.services.version_service import VersionService
+from users.models import Users
+
+pytestmark = pytest.mark.django_db
+
+SIGNUP = {
+    'email': 'new@example.com',
+    'username': 'new_user',
+    'first_name': 'Имя',
+    'last_name': 'Фамилия',
+    'password': 'Complex-password-1',
+}
+
+
+@pytest.fixture
+def recipes_version(django_capture_on_commit_callbacks):
+    def recipes_version(action):
+        before = VersionService.get_version('recipes')
+        with django_capture_on_commit_callbacks(execute=True):
+            action()
+        return VersionService.get_version('recipes') != before
+    return recipes_version
+
+
+def test_signup_does_not_bump_recipes(recipes_version, anonymous_client):
+    def signup():
+        response = anonymous_client.post('/api/users/', SIGNUP)
+        assert response.status_code == 201
+    assert not recipes_version(signup)
+
+
+def test_save_without_author_changes_does_not_bump_recipes(
+    recipes_version, author
+):
+    loaded = Users.objects.get(pk=author.pk)
+    loaded.set_password('Another-password-1')
+    assert not recipes_version(loaded.save)
+    author.is_active = False
+    assert not recipes_version(author.save)
+
+
+@pytest.mark.parametrize('update_fields', (None, ['first_name']))
+def test_author_change_bumps_recipes(recipes_version, author, update_fields):
+    loaded = Users.objects.get(pk=author.pk)
+    loaded.first_name = 'Другое'
+    assert recipes_version(lambda: loaded.save(update_fields=update_fields))
+    assert not recipes_version(loaded.save)
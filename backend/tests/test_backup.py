@@ -0,0 +1,43 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from recipes.models import Favourites, ShoppingCard
+from recipes.services.backup_service import BACKUP_MODELS, BackupService
+from users.models import Subscribers
+
+pytestmark = pytest.mark.django_db
+
+
+def dump():
+    return {
+        label: list(model.objects.order_by('pk').values())
+        for label, model in BACKUP_MODELS.items()
+    }
+
+
+def test_backup_restore_round_trip(tmp_path, user, author, recipes):
+    Favourites.objects.create(user=user, recipe=recipes[0])
+    ShoppingCard.objects.create(user=user, recipe=recipes[1])
+    Subscribers.objects.create(author=author, subscriber=user)
+    expected = dump()
+    call_command('backup', str(tmp_path), stdout=StringIO())
+    for model in reversed(BACKUP_MODELS.values()):
+        model.objects.all().delete()
+    call_command('restore', str(tmp_path), stdout=StringIO())
+    assert dump() == expected
+
+
+def test_single_process_backup_is_one_snapshot():
+    assert BackupService.is_snapshot_shared(1)
+    assert not BackupService.is_snapshot_shared(4)
+
+
+def test_backup_warns_about_inconsistent_parallel_backup(tmp_path):
+    stderr = StringIO()
+    call_command(
+        'backup', str(tmp_path), '--models', 'recipes.tags',
+        '--processes', '2', stdout=StringIO(), stderr=stderr
+    )
+    assert 'несогласованным' in stderr.getvalue()
@@ -0,0 +1,119 @@
+import pytest
+from django.db import connection, transaction
+from django.db.models.signals import pre_delete
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Favourites, Recipes, ShoppingCard
+from recipes.services.counter_service import CounterService
+from users.models import Subscribers, Users
+
+pytestmark = pytest.mark.django_db
+
+
+def add_relations(recipe, users):
+    for model in (Favourites, ShoppingCard):
+        for user in users:
+            model.objects.create(user=user, recipe=recipe)
+
+
+def count_delete_queries(instance):
+    with CaptureQueriesContext(connection) as context:
+        instance.delete()
+    return len(context.captured_queries)
+
+
+def test_recipe_delete_queries_do_not_depend_on_relations(
+    make_user, make_recipe
+):
+    users = [make_user(number) for number in range(2, 22)]
+    few, many = make_recipe(0), make_recipe(1)
+    add_relations(few, users[:2])
+    add_relations(many, users)
+    assert count_delete_queries(many) == count_delete_queries(few)
+    author = Users.objects.get(pk=few.author_id)
+    assert author.recipes_count == 0
+
+
+def test_user_delete_updates_counters_in_bulk(make_user, make_recipe, author):
+    users = [make_user(number) for number in range(2, 6)]
+    recipe = make_recipe(0)
+    own = make_recipe(1, recipe_author=users[0])
+    add_relations(recipe, users)
+    add_relations(own, users[1:])
+    for subscriber in users:
+        Subscribers.objects.create(author=author, subscriber=subscriber)
+    Subscribers.objects.create(author=users[0], subscriber=users[1])
+    users[0].delete()
+    recipe.refresh_from_db()
+    author.refresh_from_db()
+    assert (recipe.favorites_count, recipe.in_carts_count) == (3, 3)
+    assert author.subscribers_count == 3
+    assert not Recipes.objects.filter(pk=own.pk).exists()
+
+
+def test_relation_delete_via_api_updates_counters(
+    user, user_client, make_recipe
+):
+    recipe = make_recipe(0)
+    add_relations(recipe, [user])
+    for path in ('favorite', 'shopping_cart'):
+        response = user_client.delete(f'/api/recipes/{recipe.id}/{path}/')
+        assert response.status_code == 204
+    recipe.refresh_from_db()
+    assert (recipe.favorites_count, recipe.in_carts_count) == (0, 0)
+
+
+def test_copy_of_recipe_starts_with_empty_counters(user, make_recipe):
+    recipe = make_recipe(0)
+    add_relations(recipe, [user])
+    copy = Recipes.objects.get(pk=recipe.pk)
+    copy.pk = None
+    copy.short_link = ''
+    copy.save()
+    assert copy.pk != recipe.pk
+    copy.refresh_from_db()
+    recipe.refresh_from_db()
+    assert (copy.favorites_count, copy.in_carts_count) == (0, 0)
+    assert (recipe.favorites_count, recipe.in_carts_count) == (1, 1)
+
+
+def test_save_after_delete_inserts_row_again(make_recipe, author):
+    recipe = Recipes.objects.get(pk=make_recipe(0).pk)
+    Recipes.objects.filter(pk=recipe.pk).delete()
+    recipe.save()
+    assert Recipes.objects.filter(pk=recipe.pk).exists()
+    Users.objects.filter(pk=author.pk).delete()
+    author.save()
+    assert Users.objects.filter(pk=author.pk).exists()
+
+
+def test_save_does_not_overwrite_counters(user, make_recipe):
+    recipe = make_recipe(0)
+    add_relations(recipe, [user])
+    recipe.name = 'Другое название'
+    recipe.save()
+    recipe.refresh_from_db()
+    assert (recipe.favorites_count, recipe.in_carts_count) == (1, 1)
+
+
+def fail_delete(sender, **kwargs):
+    raise RuntimeError
+
+
+@pytest.mark.parametrize('delete', (
+    lambda recipe: recipe.delete(),
+    lambda recipe: Recipes.objects.filter(pk=recipe.pk).delete(),
+))
+def test_failed_delete_does_not_leave_marks(delete, user, make_recipe):
+    recipe = make_recipe(0)
+    add_relations(recipe, [user])
+    pre_delete.connect(fail_delete, sender=Recipes)
+    try:
+        with pytest.raises(RuntimeError), transaction.atomic():
+            delete(recipe)
+    finally:
+        pre_delete.disconnect(fail_delete, sender=Recipes)
+    assert not CounterService.is_deleting(Recipes, recipe.pk)
+    Favourites.objects.get(user=user, recipe=recipe).delete()
+    recipe.refresh_from_db()
+    assert recipe.favorites_count == 0
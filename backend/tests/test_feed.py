@@ -0,0 +1,80 @@
+import pytest
+
+from recipes.models import FeedEntry
+from recipes.services.feed_service import FeedService
+from users.models import Subscribers
+
+pytestmark = pytest.mark.django_db
+
+THRESHOLD = 3
+
+
+@pytest.fixture
+def subscribers(settings, user, author, make_user):
+    settings.FEED_FANOUT_THRESHOLD = THRESHOLD
+    users = [user] + [make_user(number) for number in range(2, THRESHOLD + 1)]
+    for subscriber in users:
+        Subscribers.objects.create(author=author, subscriber=subscriber)
+    return users
+
+
+def get_feed_ids(client):
+    response = client.get('/api/recipes/feed/')
+    assert response.status_code == 200
+    return {recipe['id'] for recipe in response.data['results']}
+
+
+@pytest.mark.parametrize('remove', ('unsubscribe', 'delete_subscriber'))
+def test_feed_keeps_recipes_after_dropping_below_threshold(
+    remove, subscribers, user_client, make_recipe
+):
+    recipes = [make_recipe(number) for number in range(2)]
+    recipe_ids = {recipe.id for recipe in recipes}
+    assert not FeedEntry.objects.exists()
+    assert get_feed_ids(user_client) == recipe_ids
+    leaving = subscribers[-1]
+    if remove == 'unsubscribe':
+        Subscribers.objects.get(subscriber=leaving).delete()
+    else:
+        leaving.delete()
+    assert set(FeedEntry.objects.values_list('user_id', 'recipe_id')) == {
+        (subscriber.id, recipe_id)
+        for subscriber in subscribers[:-1]
+        for recipe_id in recipe_ids
+    }
+    assert get_feed_ids(user_client) == recipe_ids
+
+
+def test_rebuild_fills_feeds_in_constant_queries(
+    settings, author, make_user, make_recipe, django_assert_max_num_queries
+):
+    settings.FEED_FANOUT_THRESHOLD = 100
+    users = [make_user(number) for number in range(2, 12)]
+    for subscriber in users:
+        Subscribers.objects.create(author=author, subscriber=subscriber)
+    Subscribers.objects.create(author=users[0], subscriber=users[1])
+    recipes = [make_recipe(number) for number in range(3)]
+    expected = set(FeedEntry.objects.values_list('user_id', 'recipe_id'))
+    assert len(expected) == len(users) * len(recipes)
+    with django_assert_max_num_queries(6):
+        assert FeedService.rebuild() == len(expected)
+    assert set(
+        FeedEntry.objects.values_list('user_id', 'recipe_id')
+    ) == expected
+
+
+def test_failed_rebuild_keeps_feeds(monkeypatch, subscribers, make_recipe):
+    Subscribers.objects.filter(subscriber=subscribers[-1]).delete()
+    make_recipe(0)
+    expected = set(FeedEntry.objects.values_list('user_id', 'recipe_id'))
+    assert expected
+
+    def fail(entries):
+        raise RuntimeError
+
+    monkeypatch.setattr(FeedService, '_create', staticmethod(fail))
+    with pytest.raises(RuntimeError):
+        FeedService.rebuild()
+    assert set(
+        FeedEntry.objects.values_list('user_id', 'recipe_id')
+    ) == expected
@@ -0,0 +1,47 @@
+import pytest
+from django.db.models import FloatField, Value
+
+from recipes.services.ingredient_index import ingredient_index
+from recipes.services.search_service import SearchService
+
+pytestmark = pytest.mark.django_db
+
+URL = '/api/ingredients/?name=диент 1'
+
+
+def get_names(client):
+    response = client.get(URL)
+    assert response.status_code == 200
+    return [ingredient['name'] for ingredient in response.json()]
+
+
+def test_index_is_used_without_trigram_search(
+    monkeypatch, anonymous_client, ingredients
+):
+    calls = []
+    search = ingredient_index.search
+    monkeypatch.setattr(
+        ingredient_index, 'search',
+        lambda value: calls.append(value) or search(value)
+    )
+    names = get_names(anonymous_client)
+    assert calls == ['диент 1']
+    assert names[0] == 'Ингредиент 1'
+    assert len(names) == 11
+
+
+def test_trigram_search_takes_precedence_over_index(
+    monkeypatch, anonymous_client, ingredients
+):
+    monkeypatch.setattr(SearchService, 'is_available', lambda model: True)
+    monkeypatch.setattr(
+        SearchService, 'similarity',
+        lambda value, *fields: Value(1.0, output_field=FloatField())
+    )
+    monkeypatch.setattr(
+        ingredient_index, 'search',
+        lambda value: pytest.fail('Индекс не должен использоваться.')
+    )
+    names = get_names(anonymous_client)
+    assert names[0] == 'Ингредиент 1'
+    assert len(names) == 11
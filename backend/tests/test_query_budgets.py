@@ -0,0 +1,24 @@
+import random
+from io import StringIO
+
+import pytest
+
+from api.management.commands.benchmark_api import BUDGETS, Command
+
+
+@pytest.mark.django_db(transaction=True)
+def test_endpoints_stay_within_query_budgets():
+    """
+    Сценарии benchmark_api на небольшой базе: число запросов
+    не зависит от объёма данных, поэтому бюджеты те же.
+    """
+    command = Command(stdout=StringIO())
+    fixtures = command.seed(10, 40, 3, random.Random(0))
+    results = command.run_scenarios(fixtures, repeat=1)
+    assert set(results) == set(BUDGETS)
+    exceeded = {
+        name: (result['queries'], BUDGETS[name]['queries'])
+        for name, result in results.items()
+        if result['queries'] > BUDGETS[name]['queries']
+    }
+    assert not exceeded
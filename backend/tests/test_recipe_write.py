@@ -0,0 +1,74 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import RecipesWriteSerializer
+from recipes.models import Recipes
+
+pytestmark = pytest.mark.django_db
+
+
+def post_recipe(client, payload):
+    with CaptureQueriesContext(connection) as context:
+        response = client.post('/api/recipes/', payload, format='json')
+    assert response.status_code == 201, response.json()
+    return response, len(context.captured_queries)
+
+
+def test_create_queries_do_not_depend_on_ingredients_count(
+    user_client, ingredients, recipe_payload
+):
+    ids = [ingredient.id for ingredient in ingredients]
+    _, few = post_recipe(user_client, recipe_payload(ids[:2]))
+    response, many = post_recipe(user_client, recipe_payload(ids[:30]))
+    assert many == few
+    assert len(response.json()['ingredients']) == 30
+
+
+def test_missing_ids_are_reported_together(
+    user_client, ingredients, tags, recipe_payload
+):
+    response = user_client.post(
+        '/api/recipes/',
+        recipe_payload(
+            [ingredients[0].id, 99999, 99998], [tags[0].id, 777, 778]
+        ),
+        format='json'
+    )
+    assert response.status_code == 400
+    assert response.json() == {
+        'ingredients': ['Ингредиенты с id 99998, 99999 не существуют.'],
+        'tags': ['Теги с id 777, 778 не существуют.'],
+    }
+
+
+def test_bulk_validation_preloads_ids(
+    rf, user, ingredients, recipe_payload, django_assert_num_queries
+):
+    data = [
+        recipe_payload([ingredient.id for ingredient in ingredients[:5]])
+        for _ in range(10)
+    ]
+    request = rf.post('/api/recipes/bulk/')
+    request.user = user
+    serializer = RecipesWriteSerializer(
+        data=data, many=True, context={'request': request}
+    )
+    # Один запрос ингредиентов и один тегов на весь пакет.
+    with django_assert_num_queries(2):
+        assert serializer.is_valid(), serializer.errors
+
+
+def test_bulk_create(user_client, ingredients, recipe_payload):
+    ids = [ingredient.id for ingredient in ingredients]
+    response = user_client.post(
+        '/api/recipes/bulk/',
+        [recipe_payload(ids[number:number + 3]) for number in range(5)],
+        format='json'
+    )
+    assert response.status_code == 201, response.json()
+    created = response.json()
+    assert [set(item) for item in created] == [{'id', 'short_link'}] * 5
+    recipe = Recipes.objects.get(pk=created[2]['id'])
+    assert created[2]['short_link'].endswith(f'/s/{recipe.short_link}/')
+    assert recipe.ingredients.count() == 3 and recipe.tags.count() == 2
@@ -0,0 +1,32 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Favourites, ShoppingCard
+from users.models import Subscribers
+
+pytestmark = pytest.mark.django_db
+
+
+def count_queries(client, url):
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+@pytest.mark.parametrize('client_name', ('anonymous_client', 'user_client'))
+def test_recipes_list_queries_do_not_depend_on_page_size(
+    request, client_name, recipes, user, author, django_assert_num_queries
+):
+    Favourites.objects.create(user=user, recipe=recipes[0])
+    ShoppingCard.objects.create(user=user, recipe=recipes[1])
+    Subscribers.objects.create(author=author, subscriber=user)
+    client = request.getfixturevalue(client_name)
+    queries = count_queries(client, '/api/recipes/?limit=1')
+    cache.clear()
+    with django_assert_num_queries(queries):
+        response = client.get('/api/recipes/?limit=10')
+    assert len(response.json()['results']) == 10
@@ -0,0 +1,46 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer, orjson
+
+PAYLOADS = {
+    'datetime': {
+        'datetime': datetime.datetime(
+            2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc
+        ),
+        'date': datetime.date(2024, 1, 2),
+        'time': datetime.time(3, 4, 5, 678901),
+        'timedelta': datetime.timedelta(days=1, seconds=5),
+    },
+    'decimal': {'amount': Decimal('12.50'), 'large': Decimal('1e16')},
+    'lazy-string': {'detail': gettext_lazy('Not found.')},
+    'uuid': {'id': uuid.UUID(int=1)},
+    'int-keys': {1: 'int', None: 'none', 'str': 'str'},
+    'bool-keys': {True: 'bool', False: 'no'},
+    'line-separators': {'text': 'a\u2028b\u2029c'},
+    'big-int': {'value': 2 ** 70, 'negative': -2 ** 65},
+    'nested': [{'name': 'Рецепт', 'tags': [{'id': 1, 'slug': 'tag'}]}],
+    'empty': [],
+}
+
+
+@pytest.mark.parametrize('name', PAYLOADS)
+def test_output_matches_json_renderer(name):
+    data = PAYLOADS[name]
+    assert (
+        FastJSONRenderer().render(data) == JSONRenderer().render(data)
+    )
+
+
+@pytest.mark.skipif(orjson is None, reason='orjson не установлен')
+def test_floats_are_formatted_by_orjson():
+    data = {'f': 1e16, 'h': 1.5e-7, 'plain': 0.1, 'nan': float('nan')}
+    assert JSONRenderer().render({'f': 1e16}) == b'{"f":1e+16}'
+    assert FastJSONRenderer().render(data) == (
+        b'{"f":1e16,"h":1.5e-7,"plain":0.1,"nan":null}'
+    )
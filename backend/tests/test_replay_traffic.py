@@ -0,0 +1,23 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from recipes.models import Recipes
+
+pytestmark = pytest.mark.django_db
+
+
+def test_replay_refuses_writes_without_flag(tmp_path, user, recipes):
+    log = tmp_path / 'traffic.jsonl'
+    log.write_text('\n'.join(json.dumps(entry) for entry in (
+        {'method': 'GET', 'path': '/api/recipes/'},
+        {
+            'method': 'DELETE',
+            'path': f'/api/recipes/{recipes[0].id}/',
+            'user': user.email
+        },
+    )))
+    with pytest.raises(CommandError, match='--allow-writes'):
+        call_command('replay_traffic', str(log))
+    assert Recipes.objects.filter(pk=recipes[0].id).exists()
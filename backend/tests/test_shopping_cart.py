@@ -0,0 +1,43 @@
+import pytest
+
+from api.renderers import ShoppingCartRenderer
+from recipes.models import ShoppingCard
+
+pytestmark = pytest.mark.django_db
+
+URL = '/api/recipes/download_shopping_cart/'
+
+
+def test_shopping_cart_renderer_requires_stream():
+    with pytest.raises(TypeError):
+        ShoppingCartRenderer()
+
+
+@pytest.mark.parametrize('query', ('', '?format=csv', '?format=json'))
+def test_unauthenticated_download_returns_json_error(anonymous_client, query):
+    response = anonymous_client.get(URL + query)
+    assert response.status_code == 401
+    assert response['Content-Type'] == 'application/json'
+    assert set(response.json()) == {'detail'}
+
+
+def test_unknown_format_returns_json_error(user_client):
+    response = user_client.get(URL + '?format=xml')
+    assert response.status_code == 404
+    assert response['Content-Type'] == 'application/json'
+    assert set(response.json()) == {'detail'}
+
+
+@pytest.mark.parametrize('file_format, content_type', (
+    ('txt', 'text/plain'),
+    ('csv', 'text/csv'),
+    ('json', 'application/json'),
+))
+def test_download_uses_requested_format(
+    user, user_client, make_recipe, file_format, content_type
+):
+    ShoppingCard.objects.create(user=user, recipe=make_recipe(0))
+    response = user_client.get(URL + f'?format={file_format}')
+    assert response.status_code == 200
+    assert response['Content-Type'] == f'{content_type}; charset=utf-8'
+    assert 'Ингредиент 0' in b''.join(response.streaming_content).decode()
@@ -0,0 +1,21 @@
+import pytest
+
+from recipes.models import Recipes
+from users.models import Subscribers
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize('limit', (None, 2))
+def test_subscription_recipes_ordered_by_pub_date_and_id(
+    limit, user, author, user_client, make_recipe
+):
+    recipes = [make_recipe(number) for number in range(4)]
+    Recipes.objects.update(pub_date=recipes[0].pub_date)
+    Subscribers.objects.create(author=author, subscriber=user)
+    query = '' if limit is None else f'?recipes_limit={limit}'
+    response = user_client.get(f'/api/users/subscriptions/{query}')
+    assert response.status_code == 200
+    ids = [recipe['id'] for recipe in response.data['results'][0]['recipes']]
+    expected = sorted((recipe.id for recipe in recipes), reverse=True)
+    assert ids == expected[:limit]
@@ -45,11 +45,11 @@ class UserAdmin(BaseUserAdmin):
 
     @admin.display(description='Количество рецептов')
     def count_recipes_tag(self, obj):
-        return obj.recipes.all().count
+        return obj.recipes_count
 
     @admin.display(description='Количество подписок на автора')
     def count_subscriptions_tag(self, obj):
-        return obj.user_subscriptions.all().count()
+        return obj.subscribers_count
 
 
 @admin.register(Subscribers)
@@ -0,0 +1,20 @@
+# Generated by Django 3.2 on 2026-10-17 06:58
+
+from django.db import migrations
+import users.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_counters'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='users',
+            managers=[
+                ('objects', users.models.UsersManager()),
+            ],
+        ),
+    ]
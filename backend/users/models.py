@@ -1,12 +1,20 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.core.exceptions import ValidationError
 from django.db import models
 
 from .constaints import EMAIL_LENGTH, NAME_LENGTH
 from .validators import username_validator
+from recipes.services.counter_service import (
+    CounterFieldsMixin,
+    CounterQuerySet
+)
 
 
-class Users(AbstractUser):
+class UsersManager(UserManager.from_queryset(CounterQuerySet)):
+    """Менеджер пользователей, см. CounterFieldsMixin."""
+
+
+class Users(CounterFieldsMixin, AbstractUser):
     """Кастомная модель User."""
 
     USERNAME_FIELD = 'email'
@@ -41,12 +49,64 @@ class Users(AbstractUser):
         null=True,
         verbose_name='Аватар'
     )
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество рецептов'
+    )
+    subscribers_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество подписчиков'
+    )
+
+    objects = UsersManager()
+
+    counter_fields = ('recipes_count', 'subscribers_count')
+    # Поля, которые выводятся в рецептах как данные автора.
+    author_fields = ('username', 'first_name', 'last_name', 'email', 'avatar')
 
     class Meta:
         ordering = ('username',)
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_author_values()
+        return instance
+
+    def get_author_values(self, update_fields=None):
+        """Загруженные значения полей author_fields из update_fields."""
+        deferred = self.get_deferred_fields()
+        return {
+            name: str(getattr(self, name))
+            for name in self.author_fields
+            if name not in deferred
+            and (update_fields is None or name in update_fields)
+        }
+
+    def remember_author_values(self, update_fields=None):
+        self._author_values = {
+            **getattr(self, '_author_values', {}),
+            **self.get_author_values(update_fields)
+        }
+
+    def author_values_changed(self, update_fields=None):
+        """
+        Сохраняемые данные автора отличаются от загруженных
+        или сохранённых ранее. Для объекта, не загруженного из БД,
+        считается, что отличаются.
+        """
+        previous = getattr(self, '_author_values', None)
+        if previous is None:
+            return True
+        return any(
+            previous.get(name) != value
+            for name, value in self.get_author_values(update_fields).items()
+        )
+
     def __str__(self):
         return self.username
 
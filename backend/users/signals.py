@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Subscribers, Users
+from recipes.services.counter_service import CounterService
+from recipes.services.feed_service import FeedService
+
+
+@receiver(post_save, sender=Subscribers)
+def subscription_created(sender, instance, created, **kwargs):
+    if created:
+        CounterService.change(
+            Users, instance.author_id, 'subscribers_count', 1
+        )
+        FeedService.backfill(instance)
+
+
+@receiver(post_delete, sender=Subscribers)
+def subscription_deleted(sender, instance, **kwargs):
+    # Подписки удаляемого пользователя учтены в subscriber_deleting,
+    # его лента удаляется каскадом.
+    if (
+        CounterService.is_deleting(Users, instance.author_id)
+        or CounterService.is_deleting(Users, instance.subscriber_id)
+    ):
+        return
+    CounterService.change(Users, instance.author_id, 'subscribers_count', -1)
+    FeedService.remove(instance)
+    FeedService.resume_fan_out((instance.author_id,))
+
+
+@receiver(pre_delete, sender=Users)
+def subscriber_deleting(sender, instance, **kwargs):
+    """Уменьшает счётчики подписчиков авторов одним UPDATE."""
+    authors = Users.objects.filter(
+        subscriptions_to_author__subscriber=instance
+    )
+    CounterService.change_many(authors, 'subscribers_count', -1)
+    FeedService.resume_fan_out(
+        authors.values('id'), excluded_subscriber_id=instance.pk
+    )